@@ -0,0 +1,262 @@
+"""
+Offline statistics for the degrees graph.
+
+Computes connected components, degree distributions with the top hub
+actors, and a distance histogram over a random sample of sources. The
+distances come from multi-source BFS: each person carries a bitmask of
+the sampled sources that have reached them, so one pass over the graph
+advances a whole batch of searches by a level. Batches are spread over
+a process pool.
+
+Usage:
+    python analytics.py [--samples N] [--processes N] [--seed S]
+                        [--output FILE] [directory]
+"""
+
+import argparse
+import heapq
+import json
+import random
+import sys
+import time
+from array import array
+
+import degrees
+import parallel
+from graph import INDEX
+
+# Number of sources advanced together by one multi-source BFS
+BATCH_SIZE = 64
+
+
+def components(graph):
+    """
+    Returns an array mapping each person to the representative of their
+    connected component.
+    """
+    parent = array(INDEX, range(graph.num_people))
+
+    def find(person):
+        while parent[person] != person:
+            parent[person] = parent[parent[person]]
+            person = parent[person]
+        return person
+
+    for movie in range(graph.num_movies):
+        stars = graph.stars_of(movie)
+        if len(stars) < 2:
+            continue
+        root = find(stars[0])
+        for star in stars[1:]:
+            other = find(star)
+            if other != root:
+                parent[other] = root
+
+    for person in range(graph.num_people):
+        parent[person] = find(person)
+    return parent
+
+
+def component_stats(graph):
+    """
+    Returns the number of components, the size of the largest one and
+    a histogram of component sizes.
+    """
+    sizes = {}
+    for root in components(graph):
+        sizes[root] = sizes.get(root, 0) + 1
+    return {
+        "count": len(sizes),
+        "largest": max(sizes.values(), default=0),
+        "size_histogram": histogram(sizes.values())
+    }
+
+
+def costar_counts(graph, start, end):
+    """
+    Returns the number of distinct co-stars of each person in
+    range(start, end).
+    """
+    counts = array(INDEX)
+    for person in range(start, end):
+        costars = set()
+        for movie in graph.movies_of(person):
+            costars.update(graph.stars_of(movie))
+        costars.discard(person)
+        counts.append(len(costars))
+    return counts
+
+
+def multi_source_bfs(graph, sources):
+    """
+    Runs one breadth-first search per source, all at once.
+
+    Returns (histogram, eccentricities): the number of (source, person)
+    pairs at each distance, excluding the sources themselves, and the
+    largest distance reached from each source.
+    """
+    seen = {}
+    frontier = {}
+    for bit, source in enumerate(sources):
+        frontier[source] = frontier.get(source, 0) | (1 << bit)
+    seen.update(frontier)
+
+    # Sources that have already crossed each movie
+    movie_seen = {}
+
+    counts = {}
+    eccentricities = [0] * len(sources)
+    level = 0
+    while frontier:
+        level += 1
+
+        movie_masks = {}
+        for person, mask in frontier.items():
+            for movie in graph.movies_of(person):
+                movie_masks[movie] = movie_masks.get(movie, 0) | mask
+
+        reached = {}
+        for movie, mask in movie_masks.items():
+            mask &= ~movie_seen.get(movie, 0)
+            if not mask:
+                continue
+            movie_seen[movie] = movie_seen.get(movie, 0) | mask
+            for star in graph.stars_of(movie):
+                new = mask & ~seen.get(star, 0)
+                if new:
+                    reached[star] = reached.get(star, 0) | new
+
+        arrived = 0
+        total = 0
+        for star, new in reached.items():
+            seen[star] = seen.get(star, 0) | new
+            total += new.bit_count()
+            arrived |= new
+        if total:
+            counts[level] = total
+
+        while arrived:
+            low = arrived & -arrived
+            eccentricities[low.bit_length() - 1] = level
+            arrived ^= low
+
+        frontier = reached
+
+    return counts, eccentricities
+
+
+def run_costars(bounds):
+    return costar_counts(parallel.worker_graph, *bounds)
+
+
+def run_bfs(sources):
+    return multi_source_bfs(parallel.worker_graph, sources)
+
+
+def analyze(graph, samples=256, seed=0, directory=None, processes=None):
+    """
+    Returns a JSON-serializable dict of statistics for `graph`, with
+    distances sampled from `samples` random people who have at least one
+    movie.
+    """
+    # Counted through movies_of so credits appended since the load count
+    movies = [len(graph.movies_of(person))
+              for person in range(graph.num_people)]
+    report = {
+        "people": graph.num_people,
+        "movies": graph.num_movies,
+        "stars": sum(movies)
+    }
+
+    start = time.perf_counter()
+    report["components"] = component_stats(graph)
+
+    rng = random.Random(seed)
+    candidates = [person for person in range(graph.num_people)
+                  if movies[person]]
+    sources = rng.sample(candidates, min(samples, len(candidates)))
+    batches = [sources[i:i + BATCH_SIZE]
+               for i in range(0, len(sources), BATCH_SIZE)]
+
+    with parallel.worker_pool(graph, directory, processes) as (pool, count):
+        step = max(1, graph.num_people // (4 * count))
+        ranges = [(i, min(i + step, graph.num_people))
+                  for i in range(0, graph.num_people, step)]
+        costars = array(INDEX)
+        for chunk in pool.map(run_costars, ranges):
+            costars.extend(chunk)
+        searches = pool.map(run_bfs, batches)
+
+    hubs = heapq.nlargest(10, range(graph.num_people),
+                          key=costars.__getitem__)
+    report["degree"] = {
+        "movies_per_person": histogram(movies),
+        "cast_size": histogram(graph.cast_size(movie)
+                               for movie in range(graph.num_movies)),
+        "costars_per_person": histogram(costars),
+        "hubs": [
+            {
+                "person_id": graph.person_ids[person],
+                "name": graph.person_names[person],
+                "costars": costars[person],
+                "movies": movies[person]
+            }
+            for person in hubs
+        ]
+    }
+
+    distances = {}
+    eccentricities = []
+    for counts, batch_eccentricities in searches:
+        for distance, count in counts.items():
+            distances[distance] = distances.get(distance, 0) + count
+        eccentricities.extend(batch_eccentricities)
+    pairs = sum(distances.values())
+    report["distances"] = {
+        "sources": len(sources),
+        "reachable_pairs": pairs,
+        "average": (sum(d * count for d, count in distances.items()) / pairs
+                    if pairs else None),
+        "histogram": {str(d): distances[d] for d in sorted(distances)},
+        "eccentricity": {
+            "min": min(eccentricities, default=None),
+            "max": max(eccentricities, default=None),
+            "histogram": histogram(eccentricities)
+        }
+    }
+
+    report["seconds"] = time.perf_counter() - start
+    return report
+
+
+def histogram(values):
+    """
+    Returns a {value: count} dict with string keys in numeric order.
+    """
+    counts = {}
+    for value in values:
+        counts[value] = counts.get(value, 0) + 1
+    return {str(value): counts[value] for value in sorted(counts)}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compute statistics for the degrees graph.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--samples", type=int, default=256,
+                        help="number of BFS sources for distance statistics")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--output", default="analytics.json")
+    args = parser.parse_args()
+
+    graph = degrees.load_graph(args.directory)
+    report = analyze(graph, args.samples, args.seed, args.directory,
+                     args.processes)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4, ensure_ascii=False)
+    print(f"Wrote {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+Long-running query mode for degrees.
+
+Loads the graph once and answers a stream of name pairs, one per line,
+writing one JSON result per line. Pairs are separated by a tab, or
+given as a JSON object with "source" and "target" keys:
+
+    Kevin Bacon<TAB>Tom Hanks
+    {"source": "Kevin Bacon", "target": "Tom Hanks"}
+
+JSON queries may also carry weighted.PathQuery options, such as
+"min_year", "max_year", "max_cast" and "weight". A JSON line with an
+"append" list of delta rows (see updates.py) adds people, movies and
+stars to the running graph and persists them:
+
+    {"append": ["movie,9001,New Movie,2024", "star,102,9001"]}
+
+Ambiguous names are reported with their candidates unless a
+disambiguation policy is given, and unknown names come back with the
+closest spelling suggestions.
+
+Usage:
+    python batch.py [options] [--input FILE] [directory]
+    python batch.py [options] --socket PATH [directory]
+"""
+
+import argparse
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+
+import degrees
+import weighted
+from names import NameIndex, POLICIES
+
+# Held by appends and by queries, so no socket client searches the
+# graph while another is changing it. Searches are CPU-bound and hold
+# the GIL anyway, so running them one at a time costs little.
+graph_lock = threading.Lock()
+
+
+def parse_pair(line):
+    """
+    Returns the (source, target, path query) in a query line, or None
+    if the line is not a valid query. The path query is None unless
+    options were given.
+    """
+    line = line.strip()
+    if line.startswith("{"):
+        try:
+            query = json.loads(line)
+            source, target = query["source"], query["target"]
+            if not isinstance(source, str) or not isinstance(target, str):
+                return None
+            options = weighted.PathQuery.from_dict(query)
+            if options.is_plain():
+                options = None
+            return source, target, options
+        except (ValueError, KeyError, TypeError):
+            return None
+    parts = line.split("\t")
+    if len(parts) != 2:
+        return None
+    return parts[0].strip(), parts[1].strip(), None
+
+
+def parse_append(line):
+    """
+    Returns the delta rows of an append command line, or None if the
+    line is not one.
+    """
+    line = line.strip()
+    if not line.startswith("{"):
+        return None
+    try:
+        rows = json.loads(line)["append"]
+    except (ValueError, KeyError, TypeError):
+        return None
+    if not isinstance(rows, list) or \
+            not all(isinstance(row, str) for row in rows):
+        return None
+    return rows
+
+
+def append(rows, index):
+    """
+    Applies delta rows to the graph and name index, persisting the
+    accepted ones, and returns the result.
+    """
+    stats = {}
+    with graph_lock:
+        degrees.append_updates(rows, index.graph, stats, index)
+    return {"appended": stats.get("applied", 0),
+            "rejected": stats.get("rejected", {})}
+
+
+def resolve(name, index, policy=None):
+    """
+    Returns (person index, error) for a name, without prompting.
+    """
+    graph = index.graph
+    indices = index.exact(name)
+    if len(indices) == 0:
+        return None, {
+            "error": "person not found",
+            "name": name,
+            "suggestions": [key for _, key, _ in index.fuzzy(name, limit=5)]
+        }
+    if len(indices) > 1:
+        if policy is not None:
+            return index.resolve(name, policy), None
+        return None, {
+            "error": "ambiguous name",
+            "name": name,
+            "candidates": [graph.person_ids[i] for i in indices]
+        }
+    return indices[0], None
+
+
+def answer(line, index, bidirectional=False, policy=None):
+    """
+    Answers one query line and returns the JSON-serializable result.
+    """
+    start = time.perf_counter()
+    pair = parse_pair(line)
+    rows = parse_append(line)
+    if rows is not None:
+        result = append(rows, index)
+    elif pair is None:
+        result = {"error": "invalid query", "query": line.rstrip("\n")}
+    else:
+        with graph_lock:
+            result = query(pair[0], pair[1], index, bidirectional, policy,
+                           pair[2])
+    result["latency_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return result
+
+
+def query(source_name, target_name, index, bidirectional=False,
+          policy=None, path_query=None):
+    """
+    Returns the result for one source/target pair of names.
+    """
+    graph = index.graph
+    result = {"source": source_name, "target": target_name}
+
+    source, error = resolve(source_name, index, policy)
+    if error is None:
+        target, error = resolve(target_name, index, policy)
+    if error is not None:
+        result.update(error)
+        return result
+
+    stats = {}
+    path = degrees.shortest_path(source, target, bidirectional=bidirectional,
+                                 stats=stats, graph=graph,
+                                 query=path_query)
+    result["explored"] = stats["explored"]
+    if path_query is not None:
+        result["cost"] = stats["cost"]
+    if path is None:
+        result["degrees"] = None
+        result["path"] = None
+    else:
+        result["degrees"] = len(path)
+        result["path"] = [
+            {
+                "movie_id": graph.movie_ids[movie],
+                "movie": graph.movie_titles[movie],
+                "person_id": graph.person_ids[person],
+                "person": graph.person_names[person]
+            }
+            for movie, person in path
+        ]
+    return result
+
+
+def serve_lines(lines, output, index, bidirectional=False, policy=None):
+    """
+    Answers every non-empty line in `lines`, writing JSON results to
+    `output` as they are computed.
+    """
+    for line in lines:
+        if not line.strip():
+            continue
+        result = answer(line, index, bidirectional, policy)
+        output.write(json.dumps(result, ensure_ascii=False) + "\n")
+        output.flush()
+
+
+def serve_socket(path, index, bidirectional=False, policy=None):
+    """
+    Answers queries from clients connecting to a Unix socket at `path`.
+    Each connection is served on its own thread.
+    """
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                line = line.decode("utf-8")
+                if not line.strip():
+                    continue
+                result = answer(line, index, bidirectional, policy)
+                self.wfile.write(
+                    (json.dumps(result, ensure_ascii=False) + "\n")
+                    .encode("utf-8"))
+                self.wfile.flush()
+
+    if os.path.exists(path):
+        os.remove(path)
+    with socketserver.ThreadingUnixStreamServer(path, Handler) as server:
+        server.daemon_threads = True
+        print(f"Listening on {path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Answer a stream of degrees queries as JSON lines.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--bidirectional", action="store_true")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="do not read or write the binary snapshot")
+    parser.add_argument("--disambiguate", choices=POLICIES,
+                        help="pick among people sharing a name instead of "
+                             "reporting an error")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--input", help="file of queries (default: stdin)")
+    source.add_argument("--socket", help="serve queries on a Unix socket")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    graph = degrees.load_graph(args.directory, cache=not args.no_cache)
+    index = NameIndex(graph)
+    print(f"Data loaded in {time.perf_counter() - start:.2f}s.",
+          file=sys.stderr)
+
+    options = (args.bidirectional, args.disambiguate)
+    if args.socket:
+        serve_socket(args.socket, index, *options)
+    elif args.input:
+        with open(args.input, encoding="utf-8") as f:
+            serve_lines(f, sys.stdout, index, *options)
+    else:
+        serve_lines(sys.stdin, sys.stdout, index, *options)
+
+
+if __name__ == "__main__":
+    main()
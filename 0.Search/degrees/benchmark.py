@@ -0,0 +1,233 @@
+"""
+Benchmarks for degrees searches.
+
+`generate` writes synthetic people/movies/stars CSV files: cast sizes
+follow a power law, and people are picked with power-law popularity so
+a few hub actors appear in many movies. `run` answers a fixed, seeded
+set of queries with each search mode in a fresh process and reports
+load time, nodes explored, query latency and peak RSS as JSON.
+
+Usage:
+    python benchmark.py generate [--edges N] [--seed S] directory
+    python benchmark.py run [--queries N] [--seed S] [--modes ...]
+                            [--output FILE] directory
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import time
+
+import degrees
+import loader
+
+# Each mode is (data representation, bidirectional)
+MODES = {
+    "dict-forward": ("dict", False),
+    "dict-bidirectional": ("dict", True),
+    "graph-forward": ("graph", False),
+    "graph-bidirectional": ("graph", True)
+}
+
+
+def generate(directory, edges=100000, seed=0, alpha=2.0, max_cast=200,
+             movies_per_person=4.0):
+    """
+    Writes synthetic CSV files with roughly `edges` star rows to
+    `directory`. Cast sizes are drawn from a Pareto distribution with
+    shape `alpha`, and people are drawn with Zipf-like popularity.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+
+    # Cast size of each movie, until the edge budget is used up
+    casts = []
+    total = 0
+    while total < edges:
+        size = min(max_cast, int(rng.paretovariate(alpha)), edges - total)
+        casts.append(size)
+        total += size
+
+    num_people = max(1, int(edges / movies_per_person))
+    weights = list(itertools.accumulate(
+        1 / (rank + 1) ** 0.8 for rank in range(num_people)))
+
+    with open(f"{directory}/people.csv", "w", encoding="utf-8",
+              newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for person in range(num_people):
+            writer.writerow([person + 1, f"Person {person + 1}",
+                             rng.randint(1900, 2010)])
+
+    with open(f"{directory}/movies.csv", "w", encoding="utf-8",
+              newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "year"])
+        for movie in range(len(casts)):
+            writer.writerow([movie + 1, f"Movie {movie + 1}",
+                             rng.randint(1920, 2024)])
+
+    with open(f"{directory}/stars.csv", "w", encoding="utf-8",
+              newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        stars = 0
+        for movie, size in enumerate(casts):
+            cast = set(rng.choices(range(num_people), cum_weights=weights,
+                                   k=size))
+            for person in cast:
+                writer.writerow([person + 1, movie + 1])
+            stars += len(cast)
+
+    return {"people": num_people, "movies": len(casts), "stars": stars}
+
+
+def query_pairs(directory, count, seed=0):
+    """
+    Returns `count` seeded (source_id, target_id) pairs of people who
+    starred in at least one movie, or no pairs if nobody did.
+    """
+    graph = loader.stream_load(directory)
+    cast = [graph.person_ids[person] for person in range(graph.num_people)
+            if graph.person_offsets[person + 1] > graph.person_offsets[person]]
+    if not cast:
+        return []
+    rng = random.Random(seed)
+    return [(rng.choice(cast), rng.choice(cast)) for _ in range(count)]
+
+
+def run_mode(directory, mode, pairs):
+    """
+    Loads the data and answers every pair with one search mode.
+    Meant to run in a fresh process so that peak RSS is its own.
+    """
+    representation, bidirectional = MODES[mode]
+
+    start = time.perf_counter()
+    if representation == "graph":
+        graph = degrees.load_graph(directory, cache=False)
+        pairs = [(graph.person_index(source), graph.person_index(target))
+                 for source, target in pairs]
+    else:
+        graph = None
+        degrees.load_data(directory)
+    load_seconds = time.perf_counter() - start
+
+    latencies = []
+    explored = []
+    connected = 0
+    for source, target in pairs:
+        stats = {}
+        start = time.perf_counter()
+        path = degrees.shortest_path(source, target,
+                                     bidirectional=bidirectional,
+                                     stats=stats, graph=graph)
+        latencies.append(time.perf_counter() - start)
+        explored.append(stats["explored"])
+        if path is not None:
+            connected += 1
+
+    # Without queries there is nothing to summarize
+    if not latencies:
+        latency_ms = explored_mean = None
+    else:
+        latency_ms = {
+            "mean": statistics.fmean(latencies) * 1000,
+            "p50": percentile(latencies, 50) * 1000,
+            "p95": percentile(latencies, 95) * 1000,
+            "max": max(latencies) * 1000
+        }
+        explored_mean = statistics.fmean(explored)
+
+    return {
+        "mode": mode,
+        "queries": len(pairs),
+        "connected": connected,
+        "load_seconds": load_seconds,
+        "query_seconds": sum(latencies),
+        "latency_ms": latency_ms,
+        "explored": {
+            "total": sum(explored),
+            "mean": explored_mean
+        },
+        "peak_rss_kb": loader.peak_rss_kb()
+    }
+
+
+def run(directory, modes=tuple(MODES), queries=100, seed=0):
+    """
+    Returns the benchmark report for each mode over the same queries.
+    """
+    pairs = query_pairs(directory, queries, seed)
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for mode in modes:
+        with context.Pool(1) as pool:
+            results.append(pool.apply(run_mode, (directory, mode, pairs)))
+    return {
+        "directory": directory,
+        "seed": seed,
+        "python": sys.version.split()[0],
+        "results": results
+    }
+
+
+def percentile(values, p):
+    """
+    Returns the `p`th percentile of `values` (nearest rank).
+    """
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[rank - 1]
+
+
+def positive(text):
+    """Parses a command-line integer that must be at least 1."""
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {value}")
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark degrees.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    parser_generate = commands.add_parser(
+        "generate", help="write synthetic CSV files")
+    parser_generate.add_argument("directory")
+    parser_generate.add_argument("--edges", type=int, default=100000)
+    parser_generate.add_argument("--seed", type=int, default=0)
+    parser_generate.add_argument("--alpha", type=float, default=2.0,
+                                 help="power-law shape of cast sizes")
+
+    parser_run = commands.add_parser("run", help="run the query benchmark")
+    parser_run.add_argument("directory")
+    parser_run.add_argument("--queries", type=positive, default=100)
+    parser_run.add_argument("--seed", type=int, default=0)
+    parser_run.add_argument("--modes", nargs="+", choices=MODES,
+                            default=list(MODES))
+    parser_run.add_argument("--output", help="write JSON here, not stdout")
+
+    args = parser.parse_args()
+    if args.command == "generate":
+        report = generate(args.directory, args.edges, args.seed, args.alpha)
+    else:
+        report = run(args.directory, args.modes, args.queries, args.seed)
+
+    if getattr(args, "output", None):
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
+    else:
+        print(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
 import csv
 import sys
 
+import loader
+import snapshot
+import updates
+import weighted
+from names import NameIndex, POLICIES
 from util import Node, StackFrontier, QueueFrontier
 
 # Maps names to a set of corresponding person_ids
@@ -52,24 +57,106 @@ def load_data(directory):
                 pass
 
 
+def load_graph(directory, cache=True, stats=None):
+    """
+    Returns the compact graph for the CSV files in `directory`, using
+    the binary snapshot next to them when it is up to date and writing
+    a new one when it is not.
+
+    If the CSV files are read and a `stats` dict is given, it receives
+    the loader statistics, including rejected rows.
+    """
+    if cache:
+        graph = load_snapshot(directory)
+        if graph is not None:
+            return graph
+
+    graph = loader.stream_load(directory, stats=stats)
+    graph.directory = directory
+    if cache:
+        snapshot.write(directory, graph)
+    return graph
+
+
+def load_snapshot(directory):
+    """
+    Returns the graph from the snapshot in `directory`, with any
+    journaled updates applied, or None if it is missing or stale.
+    """
+    def replay(graph, text):
+        updates.apply(graph, updates.parse(text.splitlines()))
+
+    return snapshot.load(directory, replay)
+
+
+def append_updates(lines, graph=None, stats=None, index=None):
+    """
+    Applies delta file lines (see updates.py) to the loaded data and
+    persists the accepted rows. With a `graph`, they go to the graph
+    (and `index`, if given) and are written back to the CSV files and
+    snapshot in its directory; otherwise they go to the dicts filled in
+    by load_data and are not persisted.
+    """
+    records = updates.parse(lines, stats)
+    if graph is None:
+        return updates.apply_to_dicts(records, people, movies, names, stats)
+    accepted = updates.apply(graph, records, stats, index)
+    if graph.directory is not None:
+        updates.persist(graph.directory, accepted)
+    return accepted
+
+
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    args = sys.argv[1:]
+    bidirectional = "--bidirectional" in args
+    if bidirectional:
+        args.remove("--bidirectional")
+    use_graph = "--graph" in args
+    if use_graph:
+        args.remove("--graph")
+    cache = "--no-cache" not in args
+    if not cache:
+        args.remove("--no-cache")
+    policy = None
+    for arg in args:
+        if arg.startswith("--disambiguate="):
+            policy = arg.split("=", 1)[1]
+            args.remove(arg)
+            break
+    if len(args) > 1 or policy not in (None, *POLICIES) or \
+            (policy is not None and not use_graph):
+        sys.exit("Usage: python degrees.py [--bidirectional] [--graph] "
+                 "[--no-cache] [--disambiguate=POLICY] [directory]\n"
+                 f"POLICY (with --graph) is one of: {', '.join(POLICIES)}")
+    directory = args[0] if len(args) == 1 else "large"
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    if use_graph:
+        load_stats = {}
+        graph = load_graph(directory, cache=cache, stats=load_stats)
+        for name in ("people", "movies", "stars"):
+            rejected = load_stats.get(name, {}).get("rejected")
+            if rejected:
+                details = ", ".join(f"{count} {reason}"
+                                    for reason, count in rejected.items())
+                print(f"Skipped {name}.csv rows: {details}.")
+    else:
+        graph = None
+        load_data(directory)
     print("Data loaded.")
 
-    source = person_id_for_name(input("Name: "))
+    index = NameIndex(graph) if use_graph else None
+    source = person_id_for_name(input("Name: "), graph, index, policy)
     if source is None:
         sys.exit("Person not found.")
-    target = person_id_for_name(input("Name: "))
+    target = person_id_for_name(input("Name: "), graph, index, policy)
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    stats = {}
+    path = shortest_path(source, target, bidirectional=bidirectional,
+                         stats=stats, graph=graph)
 
     if path is None:
         print("Not connected.")
@@ -78,28 +165,70 @@ def main():
         print(f"{degrees} degrees of separation.")
         path = [(None, source)] + path
         for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
+            person1 = person_name(path[i][1], graph)
+            person2 = person_name(path[i + 1][1], graph)
+            movie = movie_title(path[i + 1][0], graph)
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
+    if bidirectional:
+        print(f"States explored: {stats['explored']} "
+              f"({stats['explored_forward']} forward, "
+              f"{stats['explored_backward']} backward).")
+    else:
+        print(f"States explored: {stats['explored']}.")
+
+
+def shortest_path(source, target, bidirectional=False, stats=None,
+                  graph=None, query=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target.
+
+    If no possible path, returns None.
+
+    With `bidirectional`, the search expands from both the source and
+    the target and stops when the two frontiers meet. If a `stats` dict
+    is given, the number of explored states is recorded in it.
+
+    If a `graph` is given, the search runs directly on it: the source,
+    target and returned pairs are graph indices instead of IMDB ids.
+    A weighted.PathQuery can then restrict the movies used and weigh
+    them, in which case the cheapest path is returned instead.
+    """
+    if stats is None:
+        stats = {}
+
+    if query is not None and not query.is_plain():
+        if graph is None:
+            raise ValueError("filtered and weighted queries need a graph")
+        return weighted.search(graph, source, target, query, stats)
+
+    if graph is not None:
+        neighbors = graph.neighbors
+    else:
+        neighbors = neighbors_for_person
+
+    if bidirectional:
+        return bidirectional_search(source, target, neighbors, stats)
+    return forward_search(source, target, neighbors, stats)
+
+
+def forward_search(source, target, neighbors, stats):
+    """
+    Breadth-first search from the source towards the target.
+    """
+
+    # Keep track of number of states explored
+    stats["explored"] = 0
+
+    if source == target:
+        return []
+
+    # Initialize the start of the tree
+    start = Node(state=source, parent=None, action=None)
+    frontier = QueueFrontier()
+    frontier.add(start)
 
-def shortest_path(source, target):
-    """           
-    Returns the shortest list of (movie_id, person_id) pairs           
-    that connect the source to the target.           
-           
-    If no possible path, returns None.           
-    """           
-           
-    # Keep track of number of states explored           
-    explored = 0           
-           
-    # Initialize the start of the tree           
-    start = Node(state=source, parent=None, action=None)           
-    frontier = QueueFrontier()           
-    frontier.add(start)           
-           
     # Initialize the explored set
     explored_set = set()
 
@@ -107,43 +236,147 @@ def shortest_path(source, target):
 
         # If nothing left in frontier, then no path
         if frontier.empty():
-            raise Exception("no solution")
+            return None
 
         # Choose a node from the frontier
         node = frontier.remove()
-        explored += 1
+        stats["explored"] += 1
 
         # Mark node as explored
         explored_set.add(node.state)
 
         # Add neighbors to frontier
-        for action, state in neighbors_for_person(node.state):
+        for action, state in neighbors(node.state):
             if not frontier.contains_state(state) and state not in explored_set:
-                child = Node(state=state, parent=node, action=action)            
+                child = Node(state=state, parent=node, action=action)
                 if child.state == target:
-                    
+
                     # Stores the movie and person as a tuple
                     solution = []
                     node = child
-                    
+
                     # All way back down to the start node
                     while node.parent is not None:
                         solution.append((node.action, node.state))
                         node = node.parent
-                    
+
                     # Reverse the tuple in order to get a  "top to bottom" list
                     solution.reverse()
                     return solution
-                
+
                 # Add child node into frontier
-                frontier.add(child)                
+                frontier.add(child)
 
 
-def person_id_for_name(name):
+def bidirectional_search(source, target, neighbors, stats):
+    """
+    Breadth-first search from both ends at once, always expanding one
+    full layer of whichever side has the smaller frontier.
+    """
+    stats["explored"] = 0
+    stats["explored_forward"] = 0
+    stats["explored_backward"] = 0
+
+    if source == target:
+        return []
+
+    # Maps each discovered person to (neighbor towards its root, movie_id)
+    forward_parents = {source: (None, None)}
+    backward_parents = {target: (None, None)}
+
+    # Distance of each discovered person from its root
+    forward_depth = {source: 0}
+    backward_depth = {target: 0}
+
+    forward_layer = [source]
+    backward_layer = [target]
+
+    while forward_layer and backward_layer:
+
+        if len(forward_layer) <= len(backward_layer):
+            side = "explored_forward"
+            layer = forward_layer
+            parents, depth = forward_parents, forward_depth
+            other_parents, other_depth = backward_parents, backward_depth
+        else:
+            side = "explored_backward"
+            layer = backward_layer
+            parents, depth = backward_parents, backward_depth
+            other_parents, other_depth = forward_parents, forward_depth
+
+        # Expand the whole layer, keeping the cheapest meeting point found
+        next_layer = []
+        best = None
+        for person_id in layer:
+            stats[side] += 1
+            for movie_id, neighbor in neighbors(person_id):
+                if neighbor in other_parents:
+                    length = depth[person_id] + 1 + other_depth[neighbor]
+                    if best is None or length < best[0]:
+                        best = (length, person_id, movie_id, neighbor)
+                if neighbor not in parents:
+                    parents[neighbor] = (person_id, movie_id)
+                    depth[neighbor] = depth[person_id] + 1
+                    next_layer.append(neighbor)
+
+        stats["explored"] = (stats["explored_forward"]
+                             + stats["explored_backward"])
+
+        if best is not None:
+            _, person_id, movie_id, neighbor = best
+            if side == "explored_forward":
+                return join_paths(forward_parents, backward_parents,
+                                  person_id, movie_id, neighbor)
+            return join_paths(forward_parents, backward_parents,
+                              neighbor, movie_id, person_id)
+
+        if side == "explored_forward":
+            forward_layer = next_layer
+        else:
+            backward_layer = next_layer
+
+    return None
+
+
+def join_paths(forward_parents, backward_parents, left, movie_id, right):
+    """
+    Builds the source-to-target path through the edge `left` -(movie_id)-
+    `right`, where `left` was reached from the source and `right` from
+    the target.
+    """
+    solution = []
+
+    # From the meeting edge back down to the source
+    person_id = left
+    while forward_parents[person_id][0] is not None:
+        parent, action = forward_parents[person_id]
+        solution.append((action, person_id))
+        person_id = parent
+    solution.reverse()
+
+    solution.append((movie_id, right))
+
+    # From the meeting edge up to the target
+    person_id = right
+    while backward_parents[person_id][0] is not None:
+        parent, action = backward_parents[person_id]
+        solution.append((action, parent))
+        person_id = parent
+
+    return solution
+
+
+def person_id_for_name(name, graph=None, index=None, policy=None):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+
+    If a `graph` is given, returns the person's graph index instead,
+    looked up in `index` (see person_index_for_name).
     """
+    if graph is not None:
+        return person_index_for_name(name, graph, index, policy)
+
     person_ids = list(names.get(name.lower(), set()))
     if len(person_ids) == 0:
         return None
@@ -165,11 +398,68 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
-def neighbors_for_person(person_id):
+def person_index_for_name(name, graph, index=None, policy=None):
+    """
+    Returns the graph index for a person's name, looked up in a
+    names.NameIndex as batch.py does. People sharing the name are
+    chosen between by `policy` (see names.POLICIES) if it is given,
+    and by asking otherwise. Unknown names print the closest spellings.
+    """
+    if index is None:
+        index = NameIndex(graph)
+    indices = index.exact(name)
+    if len(indices) == 0:
+        suggestions = [key for _, key, _ in index.fuzzy(name, limit=5)]
+        if suggestions:
+            print(f"Did you mean: {', '.join(suggestions)}?")
+        return None
+    elif len(indices) > 1:
+        if policy is not None:
+            return index.resolve(name, policy)
+        print(f"Which '{name}'?")
+        for person in indices:
+            person_id = graph.person_ids[person]
+            name = graph.person_names[person]
+            birth = graph.person_births[person]
+            print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
+        person_id = input("Intended Person ID: ")
+        for person in indices:
+            if graph.person_ids[person] == person_id:
+                return person
+        return None
+    else:
+        return indices[0]
+
+
+def person_name(person_id, graph=None):
+    """
+    Returns the name of a person, given an IMDB id or graph index.
+    """
+    if graph is not None:
+        return graph.person_names[person_id]
+    return people[person_id]["name"]
+
+
+def movie_title(movie_id, graph=None):
+    """
+    Returns the title of a movie, given an IMDB id or graph index.
+    """
+    if graph is not None:
+        return graph.movie_titles[movie_id]
+    return movies[movie_id]["title"]
+
+
+def neighbors_for_person(person_id, graph=None):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
+
+    If a `graph` is given, `person_id` and the returned pairs are graph
+    indices instead of IMDB ids.
     """
+    if graph is not None:
+        return set(graph.neighbors(person_id))
+
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
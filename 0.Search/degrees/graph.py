@@ -0,0 +1,292 @@
+"""
+Compact representation of the people/movies star graph.
+
+Person and movie IDs are interned to dense integers and the bipartite
+graph is stored in compressed sparse row (CSR) form: for person `p`, the
+indices of their movies are `person_movies[person_offsets[p]:
+person_offsets[p + 1]]`, and likewise `movie_stars` for the people who
+starred in each movie.
+"""
+
+from array import array
+
+# Typecode for the index arrays (signed 32-bit)
+INDEX = "i"
+
+# Typecode for movie years (signed 16-bit, 0 when unknown)
+YEAR = "h"
+
+
+class Graph():
+    def __init__(self, person_ids, person_names, person_births,
+                 movie_ids, movie_titles, movie_years,
+                 person_offsets, person_movies, movie_offsets, movie_stars):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.person_births = person_births
+        self.movie_ids = movie_ids
+        self.movie_titles = movie_titles
+        self.movie_years = movie_years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_stars = movie_stars
+        self._person_index = None
+        self._movie_index = None
+
+        # Person indices sorted by lowercase name, if available
+        self.name_order = None
+
+        # Movie years as integers, built on first use
+        self.movie_year_values = None
+
+        # Star credits appended after the CSR arrays were built, as
+        # person -> [movie] and movie -> [person]
+        self.added_movies = {}
+        self.added_stars = {}
+
+        # Lowercase name -> [person] for people appended to a graph
+        # with a name_order, which does not include them
+        self.added_names = {}
+
+        # Memory map backing the arrays, if loaded from a snapshot
+        self.snapshot = None
+
+        # Directory of the CSV files the graph was loaded from
+        self.directory = None
+
+    @classmethod
+    def from_edges(cls, person_ids, person_names, person_births,
+                   movie_ids, movie_titles, movie_years,
+                   star_people, star_movies):
+        """
+        Builds a graph from parallel arrays of (person, movie) star
+        edges, given as person and movie indices.
+        """
+        person_offsets, person_movies = group_edges(
+            len(person_ids), star_people, star_movies)
+        movie_offsets, movie_stars = group_edges(
+            len(movie_ids), star_movies, star_people)
+        return cls(person_ids, person_names, person_births,
+                   movie_ids, movie_titles, movie_years,
+                   person_offsets, person_movies, movie_offsets, movie_stars)
+
+    @property
+    def num_people(self):
+        return len(self.person_offsets) - 1
+
+    @property
+    def num_movies(self):
+        return len(self.movie_offsets) - 1
+
+    def person_index(self, person_id):
+        """
+        Returns the dense index for an IMDB person id, or None.
+        """
+        if self._person_index is None:
+            self._person_index = {
+                person_id: i for i, person_id in enumerate(self.person_ids)
+            }
+        return self._person_index.get(person_id)
+
+    def movie_index(self, movie_id):
+        """
+        Returns the dense index for an IMDB movie id, or None.
+        """
+        if self._movie_index is None:
+            self._movie_index = {
+                movie_id: i for i, movie_id in enumerate(self.movie_ids)
+            }
+        return self._movie_index.get(movie_id)
+
+    def year_values(self):
+        """
+        Returns the year of each movie as an array of integers, with 0
+        for movies whose year is unknown.
+        """
+        if self.movie_year_values is None:
+            self.movie_year_values = array(YEAR, (
+                int(year) if year.isdigit() else 0
+                for year in self.movie_years
+            ))
+        return self.movie_year_values
+
+    def cast_size(self, movie):
+        """Returns the number of people who starred in a movie."""
+        size = self.movie_offsets[movie + 1] - self.movie_offsets[movie]
+        if self.added_stars:
+            size += len(self.added_stars.get(movie, ()))
+        return size
+
+    def movies_of(self, person):
+        """Returns the movie indices a person starred in."""
+        offsets = self.person_offsets
+        movies = self.person_movies[offsets[person]:offsets[person + 1]]
+        if self.added_movies and person in self.added_movies:
+            return list(movies) + self.added_movies[person]
+        return movies
+
+    def stars_of(self, movie):
+        """Returns the person indices who starred in a movie."""
+        offsets = self.movie_offsets
+        stars = self.movie_stars[offsets[movie]:offsets[movie + 1]]
+        if self.added_stars and movie in self.added_stars:
+            return list(stars) + self.added_stars[movie]
+        return stars
+
+    def has_updates(self):
+        """True if credits were appended since the CSR arrays were built."""
+        return bool(self.added_movies)
+
+    def add_person(self, person_id, name, birth):
+        """
+        Appends a person with no movies yet and returns their index.
+        """
+        self._make_appendable()
+        person = self.num_people
+        self.person_ids.append(person_id)
+        self.person_names.append(name)
+        self.person_births.append(birth)
+        self.person_offsets.append(self.person_offsets[-1])
+        if self._person_index is not None:
+            self._person_index[person_id] = person
+        if self.name_order is not None:
+            self.added_names.setdefault(name.lower(), []).append(person)
+        return person
+
+    def add_movie(self, movie_id, title, year):
+        """
+        Appends a movie with no stars yet and returns its index.
+        """
+        self._make_appendable()
+        movie = self.num_movies
+        self.movie_ids.append(movie_id)
+        self.movie_titles.append(title)
+        self.movie_years.append(year)
+        self.movie_offsets.append(self.movie_offsets[-1])
+        if self.movie_year_values is not None:
+            self.movie_year_values.append(int(year) if year.isdigit() else 0)
+        if self._movie_index is not None:
+            self._movie_index[movie_id] = movie
+        return movie
+
+    def add_star(self, person, movie):
+        """
+        Records that a person starred in a movie, given their indices.
+        """
+        self.added_movies.setdefault(person, []).append(movie)
+        self.added_stars.setdefault(movie, []).append(person)
+
+    def compact(self):
+        """
+        Returns a graph with the appended credits merged into its CSR
+        arrays.
+        """
+        star_people = array(INDEX)
+        star_movies = array(INDEX)
+        for person in range(self.num_people):
+            for movie in self.movies_of(person):
+                star_people.append(person)
+                star_movies.append(movie)
+        graph = Graph.from_edges(
+            list(self.person_ids), list(self.person_names),
+            list(self.person_births), list(self.movie_ids),
+            list(self.movie_titles), list(self.movie_years),
+            star_people, star_movies)
+        graph.directory = self.directory
+        return graph
+
+    def _make_appendable(self):
+        """
+        Copies memory-mapped arrays and wraps read-only string tables so
+        that people and movies can be appended.
+        """
+        for name in ("person_offsets", "movie_offsets", "movie_year_values"):
+            values = getattr(self, name)
+            if isinstance(values, memoryview):
+                copy = array(values.format)
+                copy.frombytes(values.cast("B"))
+                setattr(self, name, copy)
+        for name in ("person_ids", "person_names", "person_births",
+                     "movie_ids", "movie_titles", "movie_years"):
+            values = getattr(self, name)
+            if not isinstance(values, (list, Appendable)):
+                setattr(self, name, Appendable(values))
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for people who starred with
+        a given person. A co-star sharing several movies is yielded once
+        per shared movie.
+        """
+        if self.added_movies:
+            for movie in self.movies_of(person):
+                for star in self.stars_of(movie):
+                    yield movie, star
+            return
+
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+        for i in range(person_offsets[person], person_offsets[person + 1]):
+            movie = person_movies[i]
+            for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                yield movie, movie_stars[j]
+
+    def path_ids(self, path):
+        """
+        Converts a path of (movie, person) index pairs into the
+        (movie_id, person_id) pairs used by degrees.py.
+        """
+        if path is None:
+            return None
+        return [(self.movie_ids[movie], self.person_ids[person])
+                for movie, person in path]
+
+
+class Appendable():
+    """
+    Sequence that extends a read-only sequence with appended items.
+    """
+
+    def __init__(self, base):
+        self.base = base
+        self.extra = []
+
+    def __len__(self):
+        return len(self.base) + len(self.extra)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if i < len(self.base):
+            return self.base[i]
+        return self.extra[i - len(self.base)]
+
+    def __iter__(self):
+        yield from self.base
+        yield from self.extra
+
+    def append(self, item):
+        self.extra.append(item)
+
+
+def group_edges(count, keys, values):
+    """
+    Counting sort of parallel `keys`/`values` arrays into CSR form.
+    Returns (offsets, grouped values), where the values for key `k` are
+    `grouped[offsets[k]:offsets[k + 1]]`.
+    """
+    offsets = array(INDEX, bytes(array(INDEX).itemsize * (count + 1)))
+    for key in keys:
+        offsets[key + 1] += 1
+    for i in range(count):
+        offsets[i + 1] += offsets[i]
+
+    grouped = array(INDEX, bytes(array(INDEX).itemsize * len(values)))
+    cursor = offsets[:-1]
+    for key, value in zip(keys, values):
+        grouped[cursor[key]] = value
+        cursor[key] += 1
+    return offsets, grouped
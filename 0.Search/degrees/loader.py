@@ -0,0 +1,207 @@
+"""
+Streaming loader that builds a degrees Graph straight from the CSVs.
+
+Each file is read in chunks with a plain csv.reader, looking columns up
+by index, and the compact graph is built incrementally without keeping
+the rows around. Rows that cannot be used are counted per reason
+instead of being silently dropped.
+
+Usage:
+    python loader.py [--chunk-size N] [directory]
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import sys
+import time
+from array import array
+
+from graph import Graph, INDEX
+
+CHUNK_SIZE = 65536
+
+
+def stream_load(directory, chunk_size=CHUNK_SIZE, stats=None):
+    """
+    Loads the CSV files in `directory` into a Graph.
+
+    If a `stats` dict is given, it receives per-file row counts,
+    rejected rows by reason, elapsed time and rows per second, and the
+    peak resident memory of the process.
+    """
+    if stats is None:
+        stats = {}
+
+    person_index = {}
+    person_ids = []
+    person_names = []
+    person_births = []
+
+    def add_person(row):
+        person_id = row[0]
+        if person_id in person_index:
+            return "duplicate"
+        person_index[person_id] = len(person_ids)
+        person_ids.append(person_id)
+        person_names.append(row[1])
+        person_births.append(row[2])
+
+    movie_index = {}
+    movie_ids = []
+    movie_titles = []
+    movie_years = []
+
+    def add_movie(row):
+        movie_id = row[0]
+        if movie_id in movie_index:
+            return "duplicate"
+        movie_index[movie_id] = len(movie_ids)
+        movie_ids.append(movie_id)
+        movie_titles.append(row[1])
+        movie_years.append(row[2])
+
+    star_people = array(INDEX)
+    star_movies = array(INDEX)
+
+    def add_star(row):
+        person = person_index.get(row[0])
+        if person is None:
+            return "unknown person"
+        movie = movie_index.get(row[1])
+        if movie is None:
+            return "unknown movie"
+        star_people.append(person)
+        star_movies.append(movie)
+
+    stats["people"] = read_file(f"{directory}/people.csv",
+                                ("id", "name", "birth"), add_person,
+                                chunk_size)
+    stats["movies"] = read_file(f"{directory}/movies.csv",
+                                ("id", "title", "year"), add_movie,
+                                chunk_size)
+    stats["stars"] = read_file(f"{directory}/stars.csv",
+                               ("person_id", "movie_id"), add_star,
+                               chunk_size)
+
+    graph = Graph.from_edges(person_ids, person_names, person_births,
+                             movie_ids, movie_titles, movie_years,
+                             star_people, star_movies)
+
+    # The same credit listed twice would otherwise show up as a
+    # duplicate edge in both directions
+    duplicates = count_duplicate_stars(graph)
+    if duplicates:
+        stats["stars"]["rejected"]["duplicate"] = duplicates
+        stats["stars"]["loaded"] -= duplicates
+        graph = drop_duplicate_stars(graph)
+
+    stats["peak_rss_kb"] = peak_rss_kb()
+    return graph
+
+
+def read_file(path, columns, add, chunk_size):
+    """
+    Feeds the given `columns` of every row in a CSV file to `add`, a
+    chunk at a time. `add` returns a reason string to reject a row.
+
+    Returns the row statistics for the file.
+    """
+    start = time.perf_counter()
+    stats = {"rows": 0, "loaded": 0, "rejected": {}}
+    rejected = stats["rejected"]
+
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        try:
+            indices = [header.index(column) for column in columns]
+        except ValueError:
+            raise ValueError(f"{path}: expected columns {', '.join(columns)}")
+        width = max(indices) + 1
+
+        while True:
+            chunk = list(itertools.islice(reader, chunk_size))
+            if not chunk:
+                break
+            stats["rows"] += len(chunk)
+            for row in chunk:
+                if len(row) < width:
+                    reason = "malformed"
+                else:
+                    reason = add([row[i] for i in indices])
+                if reason is None:
+                    stats["loaded"] += 1
+                else:
+                    rejected[reason] = rejected.get(reason, 0) + 1
+
+    stats["seconds"] = time.perf_counter() - start
+    stats["rows_per_second"] = (
+        stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+    )
+    return stats
+
+
+def count_duplicate_stars(graph):
+    """
+    Returns the number of repeated (person, movie) edges in `graph`.
+    """
+    duplicates = 0
+    for person in range(graph.num_people):
+        movies = graph.movies_of(person)
+        if len(movies) > 1:
+            duplicates += len(movies) - len(set(movies))
+    return duplicates
+
+
+def drop_duplicate_stars(graph):
+    """
+    Returns a copy of `graph` with repeated (person, movie) edges removed.
+    """
+    star_people = array(INDEX)
+    star_movies = array(INDEX)
+    for person in range(graph.num_people):
+        for movie in dict.fromkeys(graph.movies_of(person)):
+            star_people.append(person)
+            star_movies.append(movie)
+    return Graph.from_edges(graph.person_ids, graph.person_names,
+                            graph.person_births, graph.movie_ids,
+                            graph.movie_titles, graph.movie_years,
+                            star_people, star_movies)
+
+
+def peak_rss_kb():
+    """
+    Returns the peak resident set size of this process in kilobytes,
+    or None where it cannot be measured (the resource module is Unix
+    only).
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        # Reported in bytes on macOS
+        peak //= 1024
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load the degrees CSV files and report statistics.")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    stats = {}
+    graph = stream_load(args.directory, args.chunk_size, stats)
+    stats["num_people"] = graph.num_people
+    stats["num_movies"] = graph.num_movies
+    stats["num_stars"] = len(graph.person_movies)
+    print(json.dumps(stats, indent=4))
+
+
+if __name__ == "__main__":
+    main()
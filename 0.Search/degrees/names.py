@@ -0,0 +1,250 @@
+"""
+Name lookup index for the degrees graph.
+
+People are kept in one array sorted by lowercase name, which a
+snapshot stores ready-made, so exact and prefix lookups are a binary
+search and building the index costs nothing per person. Fuzzy lookups
+use a symmetric-delete table, built on the first one: every unique name
+is stored under each of its variants with up to `max_distance`
+characters deleted, and a query only has to look up its own deletion
+variants before checking the candidates' edit distance.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import combinations
+from threading import Lock
+
+from graph import INDEX
+
+# Ways of picking one person among several with the same name
+POLICIES = ("most_movies", "earliest_birth", "latest_birth", "first")
+
+
+class NameIndex():
+    def __init__(self, graph, max_distance=1):
+        self.graph = graph
+        self.max_distance = max_distance
+
+        # Person indices sorted by lowercase name. A snapshot stores
+        # this order, so an index over a mapped graph reads names only
+        # as lookups need them and does no work per person up front.
+        if graph.name_order is not None:
+            self.order = graph.name_order
+            added = graph.added_names
+        else:
+            names = graph.person_names
+            self.order = array(INDEX, sorted(
+                range(graph.num_people),
+                key=lambda person: names[person].lower()))
+            added = {}
+
+        # Sorted unique names; the people called keys[i] are
+        # order[offsets[i]:offsets[i + 1]]. Only fuzzy lookups need
+        # them, so they are built with the symmetric-delete table.
+        self.keys = None
+        self.offsets = None
+        self._deletes = None
+        self._deletes_lock = Lock()
+
+        # Lowercase name -> [person] for people added after `order`
+        self.added = {key: list(people) for key, people in added.items()}
+
+    def key(self, person):
+        """Returns the lowercase name of a person."""
+        return self.graph.person_names[person].lower()
+
+    def span(self, name, start=0):
+        """
+        Returns (start, end) such that order[start:end] are the people
+        called `name`, which must be lowercase.
+        """
+        start = bisect_left(self.order, name, lo=start, key=self.key)
+        end = bisect_right(self.order, name, lo=start, key=self.key)
+        return start, end
+
+    def people(self, key, start, end):
+        """
+        Returns order[start:end], the people called `key`, together
+        with anyone called `key` who was added since the build.
+        """
+        people = list(self.order[start:end])
+        people.extend(self.added.get(key, ()))
+        return people
+
+    def group(self, key_index):
+        """Returns the person indices sharing the name keys[key_index]."""
+        return self.people(self.keys[key_index], self.offsets[key_index],
+                           self.offsets[key_index + 1])
+
+    def add(self, person):
+        """
+        Adds a person appended to the graph after the index was built.
+        """
+        self.added.setdefault(self.key(person), []).append(person)
+
+    def exact(self, name):
+        """
+        Returns the person indices with exactly this name, ignoring case.
+        """
+        name = name.lower()
+        return self.people(name, *self.span(name))
+
+    def prefix(self, prefix, limit=10):
+        """
+        Returns up to `limit` (name, person indices) pairs for names
+        starting with `prefix`, in alphabetical order.
+        """
+        prefix = prefix.lower()
+        matches = []
+        i = bisect_left(self.order, prefix, key=self.key)
+        while i < len(self.order) and len(matches) < limit:
+            key = self.key(self.order[i])
+            if not key.startswith(prefix):
+                break
+            start, end = self.span(key, i)
+            matches.append((key, self.people(key, start, end)))
+            i = end
+
+        # Names added since the build that are not in order; iterate a
+        # copy since socket handlers may be appending concurrently
+        new = [(key, list(people))
+               for key, people in list(self.added.items())
+               if key.startswith(prefix) and not self.is_known(key)]
+        if new:
+            matches = sorted(matches + new)[:limit]
+        return matches
+
+    def is_known(self, key):
+        """True if someone in `order` is called `key`."""
+        start, end = self.span(key)
+        return start < end
+
+    def fuzzy(self, name, max_distance=None, limit=10):
+        """
+        Returns up to `limit` (distance, name, person indices) triples for
+        names within `max_distance` edits of `name`, closest first.
+        `max_distance` cannot exceed the one the index was built with.
+        """
+        if max_distance is None:
+            max_distance = self.max_distance
+        if max_distance > self.max_distance:
+            raise ValueError(
+                f"index supports distances up to {self.max_distance}")
+
+        name = name.lower()
+        deletes = self.deletes()
+        candidates = set()
+        for variant in deletion_variants(name, max_distance):
+            candidates.update(deletes.get(variant, ()))
+
+        matches = []
+        for key_index in candidates:
+            key = self.keys[key_index]
+            distance = edit_distance(name, key, max_distance)
+            if distance is not None:
+                matches.append((distance, key, self.group(key_index)))
+
+        # Names added since the build are few, so check them directly
+        for key, people in list(self.added.items()):
+            if self.is_known(key):
+                continue
+            distance = edit_distance(name, key, max_distance)
+            if distance is not None:
+                matches.append((distance, key, list(people)))
+
+        matches.sort()
+        return matches[:limit]
+
+    def deletes(self):
+        """
+        Returns the symmetric-delete table, building it and the unique
+        names on first use.
+        """
+        with self._deletes_lock:
+            if self._deletes is None:
+                keys = []
+                offsets = array(INDEX)
+                previous = None
+                for i, person in enumerate(self.order):
+                    key = self.key(person)
+                    if key != previous:
+                        keys.append(key)
+                        offsets.append(i)
+                        previous = key
+                offsets.append(len(self.order))
+
+                deletes = {}
+                for key_index, key in enumerate(keys):
+                    for variant in deletion_variants(key, self.max_distance):
+                        deletes.setdefault(variant, []).append(key_index)
+                self.keys = keys
+                self.offsets = offsets
+                self._deletes = deletes
+        return self._deletes
+
+    def resolve(self, name, policy="most_movies"):
+        """
+        Returns a single person index for a name without prompting, or
+        None if nobody has that name. Ties between people with the same
+        name are broken by `policy`, one of POLICIES.
+        """
+        people = self.exact(name)
+        if not people:
+            return None
+        return choose(self.graph, people, policy)
+
+
+def choose(graph, people, policy="most_movies"):
+    """
+    Picks one of several person indices according to `policy`.
+    """
+    if policy == "first":
+        return people[0]
+    if policy == "most_movies":
+        return max(people, key=lambda person: len(graph.movies_of(person)))
+    if policy in ("earliest_birth", "latest_birth"):
+        born = [person for person in people
+                if graph.person_births[person].isdigit()]
+        if not born:
+            return people[0]
+        key = lambda person: int(graph.person_births[person])
+        if policy == "earliest_birth":
+            return min(born, key=key)
+        return max(born, key=key)
+    raise ValueError(f"unknown policy {policy!r}")
+
+
+def deletion_variants(word, max_distance):
+    """
+    Returns the set of strings obtained by deleting up to `max_distance`
+    characters from `word`, including `word` itself.
+    """
+    variants = {word}
+    for count in range(1, min(max_distance, len(word)) + 1):
+        for positions in combinations(range(len(word)), count):
+            skip = set(positions)
+            variants.add("".join(c for i, c in enumerate(word)
+                                 if i not in skip))
+    return variants
+
+
+def edit_distance(a, b, max_distance):
+    """
+    Returns the Levenshtein distance between `a` and `b`, or None if it
+    is greater than `max_distance`.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1,
+                               current[j - 1] + 1,
+                               previous[j - 1] + (ca != cb)))
+        if min(current) > max_distance:
+            return None
+        previous = current
+    distance = previous[-1]
+    return distance if distance <= max_distance else None
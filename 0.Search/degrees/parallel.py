@@ -0,0 +1,207 @@
+"""
+Shortest paths for many (source, target) pairs at once.
+
+Pairs are grouped by source so that each source needs a single
+breadth-first search tree, and the sources are spread over a process
+pool. Workers read the graph from its memory-mapped snapshot, so the
+pages are shared between processes rather than copied.
+
+Usage:
+    python parallel.py [--processes N] pairs.csv [directory]
+
+where pairs.csv holds one "source_id,target_id" pair of IMDB person
+ids per line. Results are written as JSON lines in input order.
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+from array import array
+from contextlib import contextmanager
+
+import degrees
+from graph import INDEX
+
+# Graph used by pool workers
+worker_graph = None
+
+
+def bfs_tree(graph, source, targets):
+    """
+    Breadth-first search from `source` over `graph` until every person
+    in `targets` has been reached.
+
+    Returns (parent_person, parent_movie) arrays, where -1 marks a
+    person that was not reached (or the source itself).
+    """
+    count = graph.num_people
+    parent_person = array(INDEX, [-1]) * count
+    parent_movie = array(INDEX, [-1]) * count
+    visited = bytearray(count)
+    visited[source] = 1
+
+    remaining = set(targets)
+    remaining.discard(source)
+
+    movies_of = graph.movies_of
+    stars_of = graph.stars_of
+
+    # Each movie only needs to be expanded once
+    seen_movies = bytearray(graph.num_movies)
+
+    layer = [source]
+    while layer and remaining:
+        next_layer = []
+        for person in layer:
+            for movie in movies_of(person):
+                if seen_movies[movie]:
+                    continue
+                seen_movies[movie] = 1
+                for star in stars_of(movie):
+                    if not visited[star]:
+                        visited[star] = 1
+                        parent_person[star] = person
+                        parent_movie[star] = movie
+                        next_layer.append(star)
+                        remaining.discard(star)
+        layer = next_layer
+
+    return parent_person, parent_movie
+
+
+def tree_path(parent_person, parent_movie, source, target):
+    """
+    Returns the (movie, person) path to `target` in a BFS tree rooted at
+    `source`, or None if the target was not reached.
+    """
+    if source == target:
+        return []
+    if parent_person[target] == -1:
+        return None
+    path = []
+    person = target
+    while person != source:
+        path.append((parent_movie[person], person))
+        person = parent_person[person]
+    path.reverse()
+    return path
+
+
+def paths_from(graph, source, targets):
+    """
+    Returns the shortest paths from `source` to each of `targets`.
+    """
+    parent_person, parent_movie = bfs_tree(graph, source, targets)
+    return [tree_path(parent_person, parent_movie, source, target)
+            for target in targets]
+
+
+def init_worker(directory):
+    global worker_graph
+    if directory is not None:
+        worker_graph = degrees.load_snapshot(directory)
+        if worker_graph is None:
+            raise RuntimeError(f"no up-to-date snapshot in {directory}")
+
+
+def run_group(group):
+    source, targets = group
+    return paths_from(worker_graph, source, targets)
+
+
+@contextmanager
+def worker_pool(graph, directory=None, processes=None):
+    """
+    Yields (pool, processes) for a process pool whose workers can reach
+    `graph` as `parallel.worker_graph`.
+
+    If `directory` has an up-to-date snapshot, workers map it instead of
+    inheriting `graph`; otherwise the graph is shared by forking, which
+    needs the "fork" start method.
+    """
+    global worker_graph
+    if directory is None or graph.snapshot is None:
+        directory = None
+        context = multiprocessing.get_context("fork")
+    else:
+        context = multiprocessing.get_context()
+    processes = processes or os.cpu_count() or 1
+    worker_graph = graph
+    try:
+        with context.Pool(processes, initializer=init_worker,
+                          initargs=(directory,)) as pool:
+            yield pool, processes
+    finally:
+        worker_graph = None
+
+
+def shortest_paths(pairs, graph, directory=None, processes=None):
+    """
+    Returns the shortest path for each (source, target) pair of person
+    indices, in the same order as `pairs`. Paths are lists of
+    (movie, person) index pairs, or None if not connected.
+
+    Work is spread over a worker_pool for `graph` and `directory`. With
+    `processes=1` everything runs in the current process.
+    """
+    groups = {}
+    for source, target in pairs:
+        groups.setdefault(source, []).append(target)
+    groups = list(groups.items())
+
+    if processes == 1 or len(groups) <= 1:
+        results = [paths_from(graph, source, targets)
+                   for source, targets in groups]
+    else:
+        with worker_pool(graph, directory, processes) as (pool, processes):
+            chunksize = max(1, len(groups) // (4 * processes))
+            results = pool.map(run_group, groups, chunksize)
+
+    paths = {}
+    for (source, targets), group_paths in zip(groups, results):
+        for target, path in zip(targets, group_paths):
+            paths[source, target] = path
+    return [paths[pair] for pair in pairs]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compute degrees of separation for many pairs.")
+    parser.add_argument("pairs", help="CSV file of source_id,target_id")
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    graph = degrees.load_graph(args.directory)
+
+    ids = []
+    pairs = []
+    with open(args.pairs, encoding="utf-8") as f:
+        for row in csv.reader(f):
+            if len(row) != 2:
+                continue
+            source = graph.person_index(row[0].strip())
+            target = graph.person_index(row[1].strip())
+            ids.append(row)
+            pairs.append((source, target))
+
+    valid = [pair for pair in pairs if None not in pair]
+    results = dict(zip(valid, shortest_paths(
+        valid, graph, args.directory, args.processes)))
+
+    for (source_id, target_id), pair in zip(ids, pairs):
+        result = {"source_id": source_id, "target_id": target_id}
+        if None in pair:
+            result["error"] = "person not found"
+        else:
+            path = graph.path_ids(results[pair])
+            result["degrees"] = None if path is None else len(path)
+            result["path"] = path
+        sys.stdout.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
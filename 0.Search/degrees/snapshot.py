@@ -0,0 +1,257 @@
+"""
+Binary snapshot of a loaded degrees Graph.
+
+The snapshot lives next to the CSV files and records the size and
+modification time of each of them, so it is rebuilt whenever the data
+changes. Loading memory-maps the file: the CSR arrays and string tables
+are views into the mapping and nothing is parsed up front.
+
+Layout (native byte order, every section 8-byte aligned):
+
+    header    magic, version, byte order, section count
+    sources   (size, mtime_ns) for people.csv, movies.csv, stars.csv
+    sections  (name, typecode, offset, length) for each section
+    data      the section bodies
+    journal   delta rows appended since (see updates.py), as UTF-8 text
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from graph import Graph, INDEX, YEAR
+
+MAGIC = b"DEGSNAP\0"
+VERSION = 2
+
+FILENAME = "degrees.snapshot"
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+HEADER = struct.Struct("<8sIBxxxI")
+SOURCE = struct.Struct("<qq")
+SECTION = struct.Struct("<16s1sxxxxxxxqq")
+
+# Typecode of string table offsets
+OFFSET = "q"
+
+# Graph attributes stored as plain index arrays
+ARRAYS = ("person_offsets", "person_movies", "movie_offsets", "movie_stars")
+
+# Graph attributes stored as string tables
+STRINGS = ("person_ids", "person_names", "person_births",
+           "movie_ids", "movie_titles", "movie_years")
+
+
+class StringTable():
+    """
+    Read-only sequence of strings stored as one UTF-8 blob plus an
+    array of offsets into it. Strings are decoded on access.
+    """
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    @classmethod
+    def pack(cls, strings):
+        """Returns (offsets, blob) for a sequence of strings."""
+        offsets = array(OFFSET, [0])
+        blob = bytearray()
+        for string in strings:
+            blob += string.encode("utf-8")
+            offsets.append(len(blob))
+        return offsets, bytes(blob)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        start = self.offsets[i]
+        end = self.offsets[i + 1]
+        return str(self.blob[start:end], "utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def path_for(directory):
+    return os.path.join(directory, FILENAME)
+
+
+def source_signature(directory):
+    """
+    Returns the (size, mtime_ns) of each CSV file in `directory`.
+    """
+    signature = []
+    for name in SOURCES:
+        info = os.stat(os.path.join(directory, name))
+        signature.append((info.st_size, info.st_mtime_ns))
+    return signature
+
+
+def name_order(graph):
+    """
+    Returns person indices sorted by lowercase name, which lets a
+    snapshot answer name lookups by binary search.
+    """
+    names = graph.person_names
+    return array(INDEX, sorted(range(graph.num_people),
+                               key=lambda person: names[person].lower()))
+
+
+def write(directory, graph):
+    """
+    Writes a snapshot of `graph` for the CSV files in `directory`.
+    """
+    if graph.has_updates():
+        graph = graph.compact()
+
+    sections = []
+    for name in ARRAYS:
+        sections.append((name, INDEX, getattr(graph, name)))
+    for name in STRINGS:
+        offsets, blob = StringTable.pack(getattr(graph, name))
+        sections.append((name + ".o", OFFSET, offsets))
+        sections.append((name + ".s", "B", blob))
+    sections.append(("name_order", INDEX, name_order(graph)))
+    sections.append(("year_values", YEAR, graph.year_values()))
+
+    signature = source_signature(directory)
+    offset = align(HEADER.size + SOURCE.size * len(signature)
+                   + SECTION.size * len(sections))
+
+    table = []
+    for name, typecode, data in sections:
+        length = len(data) * (data.itemsize if typecode != "B" else 1)
+        table.append((name, typecode, offset, length))
+        offset = align(offset + length)
+
+    path = path_for(directory)
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, byteorder(), len(sections)))
+        for size, mtime in signature:
+            f.write(SOURCE.pack(size, mtime))
+        for name, typecode, offset, length in table:
+            f.write(SECTION.pack(name.encode("ascii"),
+                                 typecode.encode("ascii"), offset, length))
+        for (_, _, data), (_, _, offset, _) in zip(sections, table):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(data)
+
+        # The journal starts at the next aligned offset
+        f.write(b"\0" * (align(f.tell()) - f.tell()))
+    os.replace(temporary, path)
+
+
+def load(directory, replay=None):
+    """
+    Memory-maps the snapshot for `directory` and returns its Graph, or
+    None if there is no snapshot or it is out of date.
+
+    If the snapshot has a journal, `replay(graph, text)` is called to
+    apply it.
+    """
+    path = path_for(directory)
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return None
+
+    with f:
+        try:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file
+            return None
+
+    try:
+        magic, version, order, count = HEADER.unpack_from(buffer, 0)
+    except struct.error:
+        return None
+    if magic != MAGIC or version != VERSION or order != byteorder():
+        return None
+
+    position = HEADER.size
+    signature = []
+    for _ in SOURCES:
+        signature.append(SOURCE.unpack_from(buffer, position))
+        position += SOURCE.size
+    try:
+        if signature != source_signature(directory):
+            return None
+    except FileNotFoundError:
+        return None
+
+    view = memoryview(buffer)
+    sections = {}
+    end = position + SECTION.size * count
+    for _ in range(count):
+        name, typecode, offset, length = SECTION.unpack_from(buffer, position)
+        position += SECTION.size
+        name = name.rstrip(b"\0").decode("ascii")
+        sections[name] = view[offset:offset + length].cast(
+            typecode.decode("ascii"))
+        end = max(end, align(offset + length))
+
+    fields = {name: sections[name] for name in ARRAYS}
+    for name in STRINGS:
+        fields[name] = StringTable(sections[name + ".o"],
+                                   sections[name + ".s"])
+
+    graph = Graph(**fields)
+    graph.name_order = sections["name_order"]
+    graph.movie_year_values = sections["year_values"]
+
+    # Keep the mapping alive for as long as the graph is
+    graph.snapshot = buffer
+    graph.directory = directory
+
+    if replay is not None and len(buffer) > end:
+        replay(graph, str(buffer[end:], "utf-8"))
+    return graph
+
+
+def is_current(directory):
+    """
+    True if `directory` has a snapshot matching its CSV files.
+    """
+    try:
+        with open(path_for(directory), "rb") as f:
+            header = f.read(HEADER.size + SOURCE.size * len(SOURCES))
+        magic, version, order, _ = HEADER.unpack_from(header, 0)
+        signature = [SOURCE.unpack_from(header, HEADER.size + SOURCE.size * i)
+                     for i in range(len(SOURCES))]
+    except (FileNotFoundError, struct.error):
+        return False
+    return (magic == MAGIC and version == VERSION and order == byteorder()
+            and signature == source_signature(directory))
+
+
+def append_journal(directory, text):
+    """
+    Appends delta text to the snapshot's journal and records the
+    current size and mtime of the CSV files, which the caller has just
+    appended the same rows to.
+    """
+    with open(path_for(directory), "r+b") as f:
+        f.seek(0, os.SEEK_END)
+        f.write(text.encode("utf-8"))
+        f.seek(HEADER.size)
+        for size, mtime in source_signature(directory):
+            f.write(SOURCE.pack(size, mtime))
+
+
+def align(offset):
+    return (offset + 7) & ~7
+
+
+def byteorder():
+    return 0 if sys.byteorder == "little" else 1
@@ -0,0 +1,202 @@
+"""
+Incremental updates for the degrees data.
+
+A delta file is a CSV file whose first column says what each row adds:
+
+    person,<id>,<name>,<birth>
+    movie,<id>,<title>,<year>
+    star,<person_id>,<movie_id>
+
+Deltas are applied to a loaded Graph (or to the dicts filled in by
+degrees.load_data) without reloading anything. Persisting them appends
+the new rows to the CSV files and to a journal at the end of the
+snapshot, whose recorded CSV sizes are then brought up to date, so the
+next start maps the snapshot and replays the journal instead of
+rebuilding it.
+
+Usage:
+    python updates.py delta.csv [directory]
+"""
+
+import argparse
+import csv
+import io
+import json
+
+import snapshot
+
+# Number of fields after the kind column
+FIELDS = {"person": 3, "movie": 3, "star": 2}
+
+# CSV file each kind of row is appended to
+FILES = {"person": "people.csv", "movie": "movies.csv", "star": "stars.csv"}
+
+
+def parse(lines, stats=None):
+    """
+    Returns the records in delta lines as (kind, fields) pairs.
+    Malformed rows are skipped and counted in `stats`.
+    """
+    records = []
+    for row in csv.reader(lines):
+        if not row:
+            continue
+        kind = row[0].strip()
+        if kind not in FIELDS or len(row) != FIELDS[kind] + 1:
+            reject(stats, "malformed")
+            continue
+        records.append((kind, tuple(row[1:])))
+    return records
+
+
+def apply(graph, records, stats=None, index=None):
+    """
+    Applies delta records to `graph`, and to a names.NameIndex if one
+    is given. Returns the records that were accepted; the others are
+    counted by reason in `stats`.
+    """
+    accepted = []
+    for kind, fields in records:
+        if kind == "person":
+            person_id, name, birth = fields
+            if graph.person_index(person_id) is not None:
+                reject(stats, "duplicate person")
+                continue
+            person = graph.add_person(person_id, name, birth)
+            if index is not None:
+                index.add(person)
+        elif kind == "movie":
+            movie_id, title, year = fields
+            if graph.movie_index(movie_id) is not None:
+                reject(stats, "duplicate movie")
+                continue
+            graph.add_movie(movie_id, title, year)
+        else:
+            person = graph.person_index(fields[0])
+            movie = graph.movie_index(fields[1])
+            if person is None:
+                reject(stats, "unknown person")
+                continue
+            if movie is None:
+                reject(stats, "unknown movie")
+                continue
+            if movie in graph.movies_of(person):
+                reject(stats, "duplicate star")
+                continue
+            graph.add_star(person, movie)
+        accepted.append((kind, fields))
+    if stats is not None:
+        stats["applied"] = stats.get("applied", 0) + len(accepted)
+    return accepted
+
+
+def apply_to_dicts(records, people, movies, names, stats=None):
+    """
+    Applies delta records to the `people`, `movies` and `names` dicts
+    used by degrees.py. Returns the records that were accepted.
+    """
+    accepted = []
+    for kind, fields in records:
+        if kind == "person":
+            person_id, name, birth = fields
+            if person_id in people:
+                reject(stats, "duplicate person")
+                continue
+            people[person_id] = {"name": name, "birth": birth,
+                                 "movies": set()}
+            names.setdefault(name.lower(), set()).add(person_id)
+        elif kind == "movie":
+            movie_id, title, year = fields
+            if movie_id in movies:
+                reject(stats, "duplicate movie")
+                continue
+            movies[movie_id] = {"title": title, "year": year, "stars": set()}
+        else:
+            person_id, movie_id = fields
+            if person_id not in people:
+                reject(stats, "unknown person")
+                continue
+            if movie_id not in movies:
+                reject(stats, "unknown movie")
+                continue
+            if movie_id in people[person_id]["movies"]:
+                reject(stats, "duplicate star")
+                continue
+            people[person_id]["movies"].add(movie_id)
+            movies[movie_id]["stars"].add(person_id)
+        accepted.append((kind, fields))
+    if stats is not None:
+        stats["applied"] = stats.get("applied", 0) + len(accepted)
+    return accepted
+
+
+def format_records(records):
+    """Returns delta records as delta file text."""
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="\n")
+    for kind, fields in records:
+        writer.writerow((kind,) + fields)
+    return output.getvalue()
+
+
+def append_rows(directory, records):
+    """
+    Appends delta records to the matching CSV files in `directory`.
+    """
+    for kind, name in FILES.items():
+        rows = [fields for record_kind, fields in records
+                if record_kind == kind]
+        if not rows:
+            continue
+        path = f"{directory}/{name}"
+        with open(path, "rb") as f:
+            f.seek(0, 2)
+            needs_newline = f.tell() > 0
+            if needs_newline:
+                f.seek(-1, 2)
+                needs_newline = f.read(1) != b"\n"
+        with open(path, "a", encoding="utf-8", newline="") as f:
+            if needs_newline:
+                f.write("\n")
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerows(rows)
+
+
+def persist(directory, records):
+    """
+    Writes accepted delta records to the CSV files in `directory` and,
+    if the snapshot there is up to date, to its journal.
+    """
+    if not records:
+        return
+    current = snapshot.is_current(directory)
+    append_rows(directory, records)
+    if current:
+        snapshot.append_journal(directory, format_records(records))
+
+
+def reject(stats, reason):
+    if stats is not None:
+        rejected = stats.setdefault("rejected", {})
+        rejected[reason] = rejected.get(reason, 0) + 1
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Append a delta file to the degrees data.")
+    parser.add_argument("delta", help="delta file of person/movie/star rows")
+    parser.add_argument("directory", nargs="?", default="large")
+    args = parser.parse_args()
+
+    # degrees imports this module, so import it only when run directly
+    import degrees
+
+    stats = {}
+    graph = degrees.load_graph(args.directory)
+    with open(args.delta, encoding="utf-8", newline="") as f:
+        degrees.append_updates(f, graph, stats)
+    print(json.dumps(stats, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,11 @@
+import heapq
+import itertools
+from collections import deque
+
+
 class Node():
+    __slots__ = ("state", "parent", "action")
+
     def __init__(self, state, parent, action):
         self.state = state
         self.parent = parent
@@ -7,13 +14,18 @@ class Node():
 
 class StackFrontier():
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+
+        # Counts of the states currently in the frontier, so that
+        # contains_state is a hash lookup instead of a linear scan
+        self.states = {}
 
     def add(self, node):
         self.frontier.append(node)
+        self._track(node.state)
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
@@ -22,10 +34,20 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self._untrack(node.state)
             return node
 
+    def _track(self, state):
+        self.states[state] = self.states.get(state, 0) + 1
+
+    def _untrack(self, state):
+        count = self.states[state] - 1
+        if count:
+            self.states[state] = count
+        else:
+            del self.states[state]
+
 
 class QueueFrontier(StackFrontier):
 
@@ -33,6 +55,30 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self._untrack(node.state)
+            return node
+
+
+class PriorityFrontier(StackFrontier):
+    """
+    Frontier that always removes the node with the lowest priority.
+    Nodes added with equal priority come out in insertion order.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.frontier = []
+        self.counter = itertools.count()
+
+    def add(self, node, priority=0):
+        heapq.heappush(self.frontier, (priority, next(self.counter), node))
+        self._track(node.state)
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = heapq.heappop(self.frontier)[2]
+            self._untrack(node.state)
             return node
@@ -0,0 +1,164 @@
+"""
+Filtered and weighted path queries over the compact degrees graph.
+
+A PathQuery restricts which movies may connect two people (by year and
+cast size) and assigns each movie a cost. Queries are answered with
+Dijkstra's algorithm. Movie years come from the graph's compact year
+array, and the plain breadth-first search in degrees.shortest_path is
+left untouched, so unfiltered queries pay nothing for these options.
+"""
+
+from util import Node, PriorityFrontier
+
+# Edge weights a query can use
+WEIGHTS = ("hops", "recency")
+
+# Options that must be integers when given
+INT_OPTIONS = ("min_year", "max_year", "max_cast", "latest_year")
+
+
+class PathQuery():
+    def __init__(self, min_year=None, max_year=None, max_cast=None,
+                 weight="hops", latest_year=None):
+        """
+        `weight` is "hops" (every movie costs 1) or "recency" (a movie
+        costs 1 plus a tenth of its age relative to `latest_year`, so
+        recent movies are preferred; unknown years cost the most).
+        """
+        if weight not in WEIGHTS:
+            raise ValueError(f"unknown weight {weight!r}")
+        self.min_year = min_year
+        self.max_year = max_year
+        self.max_cast = max_cast
+        self.weight = weight
+        self.latest_year = latest_year
+
+    @classmethod
+    def from_dict(cls, options):
+        """
+        Builds a query from a dict of option names, e.g. from JSON.
+        Raises ValueError if an option has the wrong type.
+        """
+        kwargs = {}
+        for name in INT_OPTIONS:
+            value = options.get(name)
+            if value is None:
+                continue
+            if isinstance(value, bool) or not isinstance(value, int):
+                raise ValueError(f"{name} must be an integer")
+            kwargs[name] = value
+        if "weight" in options:
+            if not isinstance(options["weight"], str):
+                raise ValueError("weight must be a string")
+            kwargs["weight"] = options["weight"]
+        return cls(**kwargs)
+
+    def is_filtered(self):
+        return (self.min_year is not None or self.max_year is not None
+                or self.max_cast is not None)
+
+    def is_plain(self):
+        """True if the query is equivalent to an unweighted BFS."""
+        return not self.is_filtered() and self.weight == "hops"
+
+    def allows(self, graph, movie, years):
+        """True if `movie` may be used to connect two people."""
+        if self.max_cast is not None and \
+                graph.cast_size(movie) > self.max_cast:
+            return False
+        if self.min_year is not None or self.max_year is not None:
+            year = years[movie]
+            if year == 0:
+                return False
+            if self.min_year is not None and year < self.min_year:
+                return False
+            if self.max_year is not None and year > self.max_year:
+                return False
+        return True
+
+    def costs(self, graph):
+        """
+        Returns the cost function over movie indices.
+        """
+        if self.weight == "hops":
+            return lambda movie: 1
+
+        years = graph.year_values()
+        latest = self.latest_year
+        if latest is None:
+            latest = max(years, default=0)
+        oldest = min((year for year in years if year), default=latest)
+        unknown = 1 + (latest - oldest) / 10
+
+        def recency(movie):
+            year = years[movie]
+            if year == 0:
+                return unknown
+            return 1 + max(0, latest - year) / 10
+
+        return recency
+
+
+def search(graph, source, target, query, stats=None):
+    """
+    Returns the cheapest list of (movie, person) index pairs connecting
+    `source` to `target` using only the movies `query` allows, or None.
+
+    If a `stats` dict is given, it receives the number of explored
+    states and the total cost of the path.
+    """
+    if stats is None:
+        stats = {}
+    stats["explored"] = 0
+    stats["cost"] = None
+
+    if source == target:
+        stats["cost"] = 0
+        return []
+
+    years = graph.year_values()
+    cost = query.costs(graph)
+
+    # Movies are only relaxed from the first (cheapest) person popped
+    # who starred in them
+    expanded_movies = set()
+
+    best = {source: 0}
+    frontier = PriorityFrontier()
+    frontier.add(Node(state=source, parent=None, action=None), 0)
+
+    explored = set()
+    while not frontier.empty():
+        node = frontier.remove()
+        if node.state in explored:
+            continue
+        explored.add(node.state)
+        stats["explored"] += 1
+
+        if node.state == target:
+            stats["cost"] = best[target]
+            solution = []
+            while node.parent is not None:
+                solution.append((node.action, node.state))
+                node = node.parent
+            solution.reverse()
+            return solution
+
+        distance = best[node.state]
+        for movie in graph.movies_of(node.state):
+            if movie in expanded_movies:
+                continue
+            expanded_movies.add(movie)
+            if not query.allows(graph, movie, years):
+                continue
+            step = distance + cost(movie)
+            for person in graph.stars_of(movie):
+                if person in explored:
+                    continue
+                if step < best.get(person, float("inf")):
+                    best[person] = step
+                    frontier.add(
+                        Node(state=person, parent=node, action=movie),
+                        step)
+
+    return None
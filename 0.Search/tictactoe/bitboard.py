@@ -0,0 +1,312 @@
+"""
+Bitboard engine for Tic Tac Toe.
+
+A position is a pair of 9-bit integers (x, o), one per player, where
+bit 3 * i + j is set if that player has a mark in row i, column j.
+"""
+
+X = "X"
+O = "O"
+
+# All nine squares
+FULL = 0b111111111
+
+# Rows, columns and diagonals
+LINES = (
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100
+)
+
+# WINS[bits] is True if the marks in `bits` complete a line
+WINS = tuple(
+    any(bits & line == line for line in LINES) for bits in range(1 << 9)
+)
+
+# Centre first, then corners, then edges, so alpha-beta cuts sooner
+ORDER = (4, 0, 2, 6, 8, 1, 3, 5, 7)
+
+# Bound types of a transposition table value
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# The 8 rotations and reflections of the board, as maps of (i, j)
+SYMMETRIES = (
+    lambda i, j: (i, j),
+    lambda i, j: (j, 2 - i),
+    lambda i, j: (2 - i, 2 - j),
+    lambda i, j: (2 - j, i),
+    lambda i, j: (i, 2 - j),
+    lambda i, j: (2 - i, j),
+    lambda i, j: (j, i),
+    lambda i, j: (2 - j, 2 - i)
+)
+
+# PERMUTATIONS[s][square] is where symmetry s moves `square` to
+PERMUTATIONS = tuple(
+    tuple(3 * i + j for i, j in (symmetry(*divmod(square, 3))
+                                 for square in range(9)))
+    for symmetry in SYMMETRIES
+)
+
+# INVERSES[s][square] is the square symmetry s moves to `square`
+INVERSES = tuple(
+    tuple(permutation.index(square) for square in range(9))
+    for permutation in PERMUTATIONS
+)
+
+# TRANSFORMS[s][bits] is the bitboard `bits` under symmetry s
+TRANSFORMS = tuple(
+    tuple(sum(1 << permutation[square] for square in range(9)
+              if bits >> square & 1) for bits in range(1 << 9))
+    for permutation in PERMUTATIONS
+)
+
+
+class TranspositionTable():
+    """
+    Search results keyed on the canonical form of a position, so the
+    up to 8 symmetric copies of a position share one entry.
+
+    Each entry holds (value, bound, square), where the square is in the
+    canonical orientation and `bound` says whether the value is EXACT
+    or only a LOWER or UPPER bound on the true value. When an entry
+    only narrows the window, its square is searched first, so the move
+    that established the bound is found again.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+def canonical(x, o):
+    """
+    Returns (key, symmetry) where `key` is the smallest encoding of
+    (x, o) under any symmetry and `symmetry` is the one producing it.
+    """
+    best = None
+    best_symmetry = 0
+    for symmetry, transform in enumerate(TRANSFORMS):
+        key = transform[x] << 9 | transform[o]
+        if best is None or key < best:
+            best = key
+            best_symmetry = symmetry
+    return best, best_symmetry
+
+
+def encode(board):
+    """
+    Returns the (x, o) bitboards for a list-of-lists board.
+    """
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def decode(x, o):
+    """
+    Returns the list-of-lists board for (x, o) bitboards.
+    """
+    return [[X if x >> (3 * i + j) & 1 else O if o >> (3 * i + j) & 1
+             else None for j in range(3)] for i in range(3)]
+
+
+def cell_of(square):
+    """Returns the (i, j) action for a square index."""
+    return divmod(square, 3)
+
+
+def square_of(action):
+    """Returns the square index for an (i, j) action."""
+    return 3 * action[0] + action[1]
+
+
+def to_move(x, o):
+    """Returns the player who has the next turn."""
+    return X if (x.bit_count() == o.bit_count()) else O
+
+
+def winner(x, o):
+    """Returns the winner of the game, if there is one."""
+    if WINS[x]:
+        return X
+    if WINS[o]:
+        return O
+    return None
+
+
+def terminal(x, o):
+    """True if someone has won or the board is full."""
+    return WINS[x] or WINS[o] or (x | o) == FULL
+
+
+def utility(x, o):
+    """Returns 1 if X has won the game, -1 if O has won, 0 otherwise."""
+    if WINS[x]:
+        return 1
+    if WINS[o]:
+        return -1
+    return 0
+
+
+def moves(x, o, first=None):
+    """
+    Yields the empty squares, in search order, starting with `first`
+    if it is given.
+    """
+    taken = x | o
+    if first is not None:
+        yield first
+    for square in ORDER:
+        if not taken >> square & 1 and square != first:
+            yield square
+
+
+def max_value(x, o, alpha, beta, table=None, trace=None, depth=0):
+    """
+    Returns (value, square) of the best move for X, who is to move.
+    If a TranspositionTable is given, positions are looked up in and
+    stored to it. If a `trace` is given (see instrument.py), the search
+    reports to it, with `depth` the ply from the root; without one, the
+    hooks cost a check against None per position and per child.
+    """
+    if trace is None:
+        if WINS[x] or WINS[o] or (x | o) == FULL:
+            return utility(x, o), None
+    elif trace.enter(x, o, depth):
+        return utility(x, o), None
+
+    first = None
+    if table is not None:
+        key, symmetry = canonical(x, o)
+        entry = table.entries.get(key)
+        if entry is None:
+            table.misses += 1
+        else:
+            table.hits += 1
+            value, bound, square = entry
+            first = INVERSES[symmetry][square]
+            if bound == EXACT:
+                return value, first
+            if bound == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if beta <= alpha:
+                if trace is not None:
+                    trace.cutoff(depth)
+                return value, first
+        original_alpha = alpha
+
+    if trace is not None:
+        trace.expand()
+    move = None
+    max_eval = float("-inf")
+    for square in moves(x, o, first):
+        if trace is None:
+            value = min_value(x | 1 << square, o, alpha, beta, table)[0]
+        else:
+            value = min_value(*trace.result(x, o, square, True), alpha,
+                              beta, table, trace, depth + 1)[0]
+        if value > max_eval:
+            max_eval = value
+            move = square
+        alpha = max(alpha, value)
+        if beta <= alpha:
+            if trace is not None:
+                trace.cutoff(depth)
+            break
+
+    if table is not None:
+        store(table, key, symmetry, max_eval, original_alpha, beta, move)
+    return max_eval, move
+
+
+def min_value(x, o, alpha, beta, table=None, trace=None, depth=0):
+    """
+    Returns (value, square) of the best move for O, who is to move.
+    If a TranspositionTable is given, positions are looked up in and
+    stored to it. If a `trace` is given (see instrument.py), the search
+    reports to it, with `depth` the ply from the root; without one, the
+    hooks cost a check against None per position and per child.
+    """
+    if trace is None:
+        if WINS[x] or WINS[o] or (x | o) == FULL:
+            return utility(x, o), None
+    elif trace.enter(x, o, depth):
+        return utility(x, o), None
+
+    first = None
+    if table is not None:
+        key, symmetry = canonical(x, o)
+        entry = table.entries.get(key)
+        if entry is None:
+            table.misses += 1
+        else:
+            table.hits += 1
+            value, bound, square = entry
+            first = INVERSES[symmetry][square]
+            if bound == EXACT:
+                return value, first
+            if bound == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if beta <= alpha:
+                if trace is not None:
+                    trace.cutoff(depth)
+                return value, first
+        original_beta = beta
+
+    if trace is not None:
+        trace.expand()
+    move = None
+    min_eval = float("inf")
+    for square in moves(x, o, first):
+        if trace is None:
+            value = max_value(x, o | 1 << square, alpha, beta, table)[0]
+        else:
+            value = max_value(*trace.result(x, o, square, False), alpha,
+                              beta, table, trace, depth + 1)[0]
+        if value < min_eval:
+            min_eval = value
+            move = square
+        beta = min(beta, value)
+        if beta <= alpha:
+            if trace is not None:
+                trace.cutoff(depth)
+            break
+
+    if table is not None:
+        store(table, key, symmetry, min_eval, alpha, original_beta, move)
+    return min_eval, move
+
+
+def store(table, key, symmetry, value, alpha, beta, square):
+    """
+    Stores a search result found with the window (alpha, beta), with
+    `square` in the orientation of the position that was searched.
+    """
+    if value <= alpha:
+        bound = UPPER
+    elif value >= beta:
+        bound = LOWER
+    else:
+        bound = EXACT
+    table.entries[key] = (value, bound, PERMUTATIONS[symmetry][square])
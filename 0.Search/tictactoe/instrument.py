@@ -0,0 +1,121 @@
+"""
+Instrumentation hooks for the bitboard search.
+
+tictactoe.minimax() uses this search when it is given a stats dict.
+It runs the bitboard.py search with a Trace hook, so it visits the
+same positions in the same order. The plain search still checks for a
+hook at each position, which costs one comparison with None. The
+stats dict is filled with:
+
+    nodes             positions visited
+    nodes_by_depth    positions visited at each ply from the root
+    cutoffs_by_depth  alpha-beta cutoffs (including table cutoffs)
+    branching_factor  children searched per expanded position
+    table             transposition table hits and misses
+    seconds           time spent applying moves ("result"), testing
+                      for the end of the game ("winner"), and in total
+"""
+
+import time
+
+from bitboard import FULL, WINS
+
+
+class Counter():
+    """
+    Search hook that only counts the positions visited, including
+    finished games. bitboard.max_value() and min_value() call it when
+    it is passed as their `trace`.
+    """
+
+    def __init__(self):
+        self.nodes = 0
+
+    def enter(self, x, o, depth):
+        """Records a visit and returns True if the game is over."""
+        self.nodes += 1
+        return WINS[x] or WINS[o] or (x | o) == FULL
+
+    def result(self, x, o, square, maximizing):
+        """Returns the position after the player to move takes `square`."""
+        if maximizing:
+            return x | 1 << square, o
+        return x, o | 1 << square
+
+    def expand(self):
+        pass
+
+    def cutoff(self, depth):
+        pass
+
+
+class Trace(Counter):
+    """
+    Search hook that records everything reported in the stats dict.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.nodes = []
+        self.cutoffs = []
+        self.expanded = 0
+        self.children = 0
+        self.result_seconds = 0
+        self.winner_seconds = 0
+
+    def enter(self, x, o, depth):
+        if depth == len(self.nodes):
+            self.nodes.append(0)
+            self.cutoffs.append(0)
+        self.nodes[depth] += 1
+
+        start = time.perf_counter()
+        finished = WINS[x] or WINS[o] or (x | o) == FULL
+        self.winner_seconds += time.perf_counter() - start
+        return finished
+
+    def result(self, x, o, square, maximizing):
+        self.children += 1
+        start = time.perf_counter()
+        position = super().result(x, o, square, maximizing)
+        self.result_seconds += time.perf_counter() - start
+        return position
+
+    def expand(self):
+        self.expanded += 1
+
+    def cutoff(self, depth):
+        self.cutoffs[depth] += 1
+
+
+def search(value, x, o, alpha, beta, table=None, stats=None):
+    """
+    Returns what `value`, bitboard.max_value or bitboard.min_value,
+    returns for the position, recording the search in `stats`.
+    """
+    if stats is None:
+        stats = {}
+    trace = Trace()
+    hits = misses = 0
+    if table is not None:
+        hits = table.hits
+        misses = table.misses
+
+    start = time.perf_counter()
+    found = value(x, o, alpha, beta, table, trace)
+    total = time.perf_counter() - start
+
+    stats["nodes"] = sum(trace.nodes)
+    stats["nodes_by_depth"] = trace.nodes
+    stats["cutoffs_by_depth"] = trace.cutoffs
+    stats["branching_factor"] = (trace.children / trace.expanded
+                                 if trace.expanded else 0)
+    if table is not None:
+        stats["table"] = {"hits": table.hits - hits,
+                          "misses": table.misses - misses}
+    stats["seconds"] = {
+        "result": trace.result_seconds,
+        "winner": trace.winner_seconds,
+        "total": total
+    }
+    return found
@@ -0,0 +1,382 @@
+"""
+Engine for m,n,k games: X and O take turns on an m x n board and the
+first to get k marks in a row, column or diagonal wins. Tic Tac Toe is
+the 3,3,3 game.
+
+Positions are a pair of m * n bit integers, as in bitboard.py. Larger
+boards are too big to search to the end, so the engine uses iterative
+deepening alpha-beta (negamax) under a time budget, scores unfinished
+positions with a heuristic, and orders moves to cut early: the previous
+best move, then wins, then blocks, then the squares with the most
+promising lines, nearest the centre first.
+
+Usage:
+    python mnk.py [-m M] [-n N] [-k K] [--time SECONDS]
+"""
+
+import argparse
+import time
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Table entry bound types
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Nodes searched between checks of the clock and cancel event
+CHECK_INTERVAL = 256
+
+
+class Timeout(Exception):
+    pass
+
+
+class Game():
+    def __init__(self, m=3, n=3, k=3):
+        if k > max(m, n):
+            raise ValueError(f"no line of {k} fits on a {m}x{n} board")
+        self.m = m
+        self.n = n
+        self.k = k
+        self.full = (1 << (m * n)) - 1
+
+        # Every run of k squares in a line
+        self.windows = []
+        for i in range(m):
+            for j in range(n):
+                for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_i = i + di * (k - 1)
+                    end_j = j + dj * (k - 1)
+                    if 0 <= end_i < m and 0 <= end_j < n:
+                        self.windows.append(sum(
+                            1 << self.square(i + di * step, j + dj * step)
+                            for step in range(k)))
+
+        # The windows through each square
+        self.windows_at = [
+            [window for window in self.windows if window >> square & 1]
+            for square in range(m * n)
+        ]
+
+        # Squares nearest the centre first
+        self.center_order = sorted(
+            range(m * n), key=lambda square: (
+                abs(2 * (square // n) - (m - 1))
+                + abs(2 * (square % n) - (n - 1)), square))
+
+        # Score of a window holding c marks of one player only; a win
+        # outweighs any sum of window scores
+        self.weights = [0] + [10 ** c for c in range(k - 1)] + [0]
+        self.win = 10 ** (k + 4)
+
+    def square(self, i, j):
+        return i * self.n + j
+
+    def cell(self, square):
+        return divmod(square, self.n)
+
+    def encode(self, board):
+        """Returns the (x, o) bitboards for a list-of-lists board."""
+        x = o = 0
+        for i in range(self.m):
+            for j in range(self.n):
+                if board[i][j] == X:
+                    x |= 1 << self.square(i, j)
+                elif board[i][j] == O:
+                    o |= 1 << self.square(i, j)
+        return x, o
+
+    def decode(self, x, o):
+        """Returns the list-of-lists board for (x, o) bitboards."""
+        return [[X if x >> self.square(i, j) & 1
+                 else O if o >> self.square(i, j) & 1 else EMPTY
+                 for j in range(self.n)] for i in range(self.m)]
+
+    def player(self, x, o):
+        return X if x.bit_count() == o.bit_count() else O
+
+    def moves(self, x, o):
+        taken = x | o
+        return [square for square in self.center_order
+                if not taken >> square & 1]
+
+    def completes(self, bits, square):
+        """True if `bits` has a full window through `square`."""
+        for window in self.windows_at[square]:
+            if bits & window == window:
+                return True
+        return False
+
+    def wins(self, bits):
+        for window in self.windows:
+            if bits & window == window:
+                return True
+        return False
+
+    def winner(self, x, o):
+        if self.wins(x):
+            return X
+        if self.wins(o):
+            return O
+        return None
+
+    def terminal(self, x, o):
+        return self.wins(x) or self.wins(o) or (x | o) == self.full
+
+    def evaluate(self, me, them):
+        """
+        Scores a position for the player to move (`me`) by the windows
+        only one player can still complete.
+        """
+        weights = self.weights
+        score = 0
+        for window in self.windows:
+            mine = me & window
+            theirs = them & window
+            if mine and not theirs:
+                score += weights[mine.bit_count()]
+            elif theirs and not mine:
+                score -= weights[theirs.bit_count()]
+        return score
+
+    def potential(self, me, them, square):
+        """
+        Scores an empty square by the marks in the open windows through
+        it, for either player.
+        """
+        score = 0
+        for window in self.windows_at[square]:
+            mine = me & window
+            theirs = them & window
+            if not theirs:
+                score += mine.bit_count()
+            if not mine:
+                score += theirs.bit_count()
+        return score
+
+
+class Search():
+    """
+    One iterative deepening search. `deadline` is a time.perf_counter()
+    value after which the search stops, and setting the `cancel`
+    threading.Event stops it early.
+    """
+
+    def __init__(self, game, deadline=None, table=None, cancel=None):
+        self.game = game
+        self.deadline = deadline
+        self.table = table if table is not None else {}
+        self.cancel = cancel
+        self.nodes = 0
+
+    def check_time(self):
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise Timeout()
+        if self.cancel is not None and self.cancel.is_set():
+            raise Timeout()
+
+    def order(self, me, them, depth, first=None):
+        """Returns the empty squares in search order."""
+        game = self.game
+        moves = game.moves(me, them)
+        if depth <= 1:
+            ordered = moves
+        else:
+            ordered = sorted(moves, key=lambda square: -game.potential(
+                me, them, square))
+
+        wins = []
+        blocks = []
+        rest = []
+        for square in ordered:
+            if square == first:
+                continue
+            if game.completes(me | 1 << square, square):
+                wins.append(square)
+            elif game.completes(them | 1 << square, square):
+                blocks.append(square)
+            else:
+                rest.append(square)
+        head = [first] if first is not None else []
+        return head + wins + blocks + rest
+
+    def negamax(self, me, them, depth, alpha, beta, ply):
+        """
+        Returns the value of a position for the player to move (`me`),
+        who has not lost yet.
+        """
+        self.nodes += 1
+        if self.nodes % CHECK_INTERVAL == 0:
+            self.check_time()
+
+        game = self.game
+        if (me | them) == game.full:
+            return 0
+        if depth == 0:
+            return game.evaluate(me, them)
+
+        key = (me, them)
+        entry = self.table.get(key)
+        first = None
+        if entry is not None:
+            entry_depth, value, bound, first = entry
+            value = from_table(game, value, ply)
+            if entry_depth >= depth:
+                if bound == EXACT:
+                    return value
+                if bound == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if beta <= alpha:
+                    return value
+        original_alpha = alpha
+
+        best = -game.win
+        move = None
+        for square in self.order(me, them, depth, first):
+            bit = 1 << square
+            if game.completes(me | bit, square):
+                value = game.win - ply - 1
+            else:
+                value = -self.negamax(them, me | bit, depth - 1,
+                                      -beta, -alpha, ply + 1)
+            if value > best:
+                best = value
+                move = square
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+
+        if best <= original_alpha:
+            bound = UPPER
+        elif best >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.table[key] = (depth, to_table(game, best, ply), bound, move)
+        return best
+
+    def root(self, me, them, depth, first=None):
+        """Returns (value, square) of a search to `depth`."""
+        game = self.game
+        alpha = -game.win
+        beta = game.win
+        move = None
+        for square in self.order(me, them, depth, first):
+            bit = 1 << square
+            if game.completes(me | bit, square):
+                return game.win - 1, square
+            value = -self.negamax(them, me | bit, depth - 1,
+                                  -beta, -alpha, 1)
+            if move is None or value > alpha:
+                alpha = value
+                move = square
+        return alpha, move
+
+
+def to_table(game, value, ply):
+    """Stores win scores relative to the node rather than the root."""
+    if value >= game.win - game.m * game.n:
+        return value + ply
+    if value <= -game.win + game.m * game.n:
+        return value - ply
+    return value
+
+
+def from_table(game, value, ply):
+    if value >= game.win - game.m * game.n:
+        return value - ply
+    if value <= -game.win + game.m * game.n:
+        return value + ply
+    return value
+
+
+def best_move(game, x, o, time_limit=1.0, max_depth=None, stats=None,
+              cancel=None, report=None):
+    """
+    Returns the best square found for the player to move within
+    `time_limit` seconds, or None if the game is over. Setting the
+    `cancel` threading.Event stops the search early, and
+    `report(depth, square, value)` is called after each completed
+    depth with the best move so far.
+
+    If a `stats` dict is given, it receives the deepest completed
+    depth, its value for the player to move and the nodes searched.
+    """
+    if stats is None:
+        stats = {}
+    stats["depth"] = 0
+    stats["value"] = None
+    stats["nodes"] = 0
+
+    if game.terminal(x, o):
+        return None
+    if game.player(x, o) == X:
+        me, them = x, o
+    else:
+        me, them = o, x
+
+    empty = game.m * game.n - (x | o).bit_count()
+    if max_depth is None or max_depth > empty:
+        max_depth = empty
+
+    deadline = None
+    if time_limit is not None:
+        deadline = time.perf_counter() + time_limit
+    search = Search(game, deadline, cancel=cancel)
+
+    # Something to play even if depth 1 does not finish
+    move = search.order(me, them, 1)[0]
+    for depth in range(1, max_depth + 1):
+        try:
+            value, move = search.root(me, them, depth, move)
+        except Timeout:
+            break
+        stats["depth"] = depth
+        stats["value"] = value
+        if report is not None:
+            report(depth, move, value)
+
+        # A forced result will not change with more depth
+        if abs(value) >= game.win - game.m * game.n:
+            break
+
+    stats["nodes"] = search.nodes
+    return move
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play an m,n,k game engine against itself.")
+    parser.add_argument("-m", type=int, default=3, help="rows")
+    parser.add_argument("-n", type=int, default=3, help="columns")
+    parser.add_argument("-k", type=int, default=3, help="marks in a row")
+    parser.add_argument("--time", type=float, default=1.0,
+                        help="seconds per move")
+    args = parser.parse_args()
+
+    game = Game(args.m, args.n, args.k)
+    x = o = 0
+    while not game.terminal(x, o):
+        stats = {}
+        player = game.player(x, o)
+        square = best_move(game, x, o, args.time, stats=stats)
+        if player == X:
+            x |= 1 << square
+        else:
+            o |= 1 << square
+        print(f"{player} plays {game.cell(square)} "
+              f"(depth {stats['depth']}, {stats['nodes']} nodes)")
+        for row in game.decode(x, o):
+            print(" ".join(mark or "." for mark in row))
+        print()
+
+    print(f"Winner: {game.winner(x, o) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
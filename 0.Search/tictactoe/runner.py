@@ -3,6 +3,14 @@ import sys
 import time
 
 import tictactoe as ttt
+import worker
+
+# Frames drawn per second while waiting for input or the computer
+FPS = 30
+
+# Shortest time the computer takes over a move, so it does not appear
+# to answer before the user's move is drawn
+THINK_SECONDS = 0.5
 
 pygame.init()
 size = width, height = 600, 400
@@ -16,15 +24,20 @@ screen = pygame.display.set_mode(size)
 mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
 moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
+smallFont = pygame.font.Font("OpenSans-Regular.ttf", 20)
+
+clock = pygame.time.Clock()
+ai = worker.MoveWorker(worker.minimax_search)
 
 user = None
 board = ttt.initial_state()
-ai_turn = False
+ai_started = None
 
 while True:
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            ai.cancel()
             sys.exit()
 
     screen.fill(black)
@@ -108,15 +121,28 @@ while True:
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
+        # Check for AI move, which is searched for in the background
         if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
+            if ai_started is None:
+                ai.start(board)
+                ai_started = time.perf_counter()
             else:
-                ai_turn = True
+                move = ai.poll()
+                if move is not None and \
+                        time.perf_counter() - ai_started >= THINK_SECONDS:
+                    board = ttt.result(board, move)
+                    ai_started = None
+
+            # Show the best move found so far
+            best, depth = ai.progress()
+            if ai_started is not None and best is not None:
+                text = f"Best so far: {best}"
+                if depth is not None:
+                    text += f" (depth {depth})"
+                progress = smallFont.render(text, True, white)
+                progressRect = progress.get_rect()
+                progressRect.center = ((width / 2), height - 20)
+                screen.blit(progress, progressRect)
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
@@ -139,8 +165,10 @@ while True:
                 mouse = pygame.mouse.get_pos()
                 if againButton.collidepoint(mouse):
                     time.sleep(0.2)
+                    ai.cancel()
                     user = None
                     board = ttt.initial_state()
-                    ai_turn = False
+                    ai_started = None
 
     pygame.display.flip()
+    clock.tick(FPS)
@@ -0,0 +1,267 @@
+"""
+Headless self-play between Tic Tac Toe agents.
+
+Two agents play a batch of games, swapping X and O every game, across a
+process pool. The report gives each agent's win rate, the draw rate,
+nodes searched per move and per-move latency percentiles, as JSON.
+
+Agents:
+    random   plays a uniformly random legal move
+    minimax  alpha-beta search with a per-game transposition table
+             (3x3 only)
+    table    looks moves up in the solution table (3x3 only)
+    mnk      the iterative deepening m,n,k engine, with --time per move
+
+Usage:
+    python selfplay.py [--games N] [--processes N] [--seed S]
+                       [--openings N] [-m M] [-n N] [-k K]
+                       [--time SECONDS] agent agent
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import time
+from math import inf
+
+import bitboard
+import instrument
+import mnk
+import solution
+
+AGENTS = ("random", "minimax", "table", "mnk")
+
+# Agents and game of each worker process, set by init_worker
+worker_agents = None
+worker_game = None
+worker_options = None
+
+
+class Agent():
+    def new_game(self):
+        """Called before each game, so no state carries across games."""
+
+
+class RandomAgent(Agent):
+    def move(self, game, x, o, rng, stats):
+        stats["nodes"] = 0
+        return rng.choice(game.moves(x, o))
+
+
+class MinimaxAgent(Agent):
+    """
+    Alpha-beta search with a transposition table that lasts one game,
+    so the nodes searched per move do not depend on which games a
+    worker process played before.
+    """
+
+    def __init__(self):
+        self.table = bitboard.TranspositionTable()
+
+    def new_game(self):
+        self.table.clear()
+
+    def move(self, game, x, o, rng, stats):
+        counter = instrument.Counter()
+        if bitboard.to_move(x, o) == bitboard.X:
+            search = bitboard.max_value
+        else:
+            search = bitboard.min_value
+        square = search(x, o, -inf, inf, self.table, counter)[1]
+        stats["nodes"] = counter.nodes
+        return square
+
+
+class TableAgent(Agent):
+    def __init__(self):
+        self.solutions = solution.load()
+        if self.solutions is None:
+            self.solutions = solution.solve()
+
+    def move(self, game, x, o, rng, stats):
+        stats["nodes"] = 0
+        return solution.lookup(self.solutions, x, o)[1]
+
+
+class MnkAgent(Agent):
+    def __init__(self, time_limit):
+        self.time_limit = time_limit
+
+    def move(self, game, x, o, rng, stats):
+        return mnk.best_move(game, x, o, self.time_limit, stats=stats)
+
+
+def make_agent(name, game, time_limit=1.0):
+    """Returns the agent called `name` for `game`."""
+    if name in ("minimax", "table") and (game.m, game.n, game.k) != (3, 3, 3):
+        raise ValueError(f"the {name} agent only plays 3x3 Tic Tac Toe")
+    if name == "random":
+        return RandomAgent()
+    if name == "minimax":
+        return MinimaxAgent()
+    if name == "table":
+        return TableAgent()
+    if name == "mnk":
+        return MnkAgent(time_limit)
+    raise ValueError(f"unknown agent {name!r}")
+
+
+def init_worker(names, size, seed, openings, time_limit):
+    global worker_agents, worker_game, worker_options
+    worker_game = mnk.Game(*size)
+    worker_agents = [make_agent(name, worker_game, time_limit)
+                     for name in names]
+    worker_options = (seed, openings)
+
+
+def play_game(index):
+    """
+    Plays game number `index`; the first agent is X in even games.
+    Returns the game record: which agent was X, the winning agent (or
+    None for a draw) and (agent, nodes, seconds) for each move.
+    """
+    seed, openings = worker_options
+    game = worker_game
+    rng = random.Random(seed * 1000003 + index)
+    first = index % 2
+
+    for agent in worker_agents:
+        agent.new_game()
+
+    x = o = 0
+    moves = []
+    while not game.terminal(x, o):
+        turn = (x | o).bit_count()
+        agent = (first + turn) % 2
+        stats = {}
+        start = time.perf_counter()
+        if turn < openings:
+            square = rng.choice(game.moves(x, o))
+        else:
+            square = worker_agents[agent].move(game, x, o, rng, stats)
+            moves.append((agent, stats.get("nodes", 0),
+                          time.perf_counter() - start))
+        if turn % 2 == 0:
+            x |= 1 << square
+        else:
+            o |= 1 << square
+
+    winner = game.winner(x, o)
+    if winner is None:
+        winning_agent = None
+    elif winner == mnk.X:
+        winning_agent = first
+    else:
+        winning_agent = 1 - first
+    return {"x": first, "winner": winning_agent, "moves": moves}
+
+
+def run(names, games=1000, processes=None, seed=0, openings=0,
+        size=(3, 3, 3), time_limit=1.0):
+    """
+    Plays `games` games between the two agents in `names` and returns
+    the report.
+    """
+    initargs = (names, size, seed, openings, time_limit)
+    processes = processes or os.cpu_count() or 1
+
+    # Build the agents here first, so bad arguments raise ValueError in
+    # this process instead of failing in pool workers that are respawned
+    # forever
+    init_worker(*initargs)
+    start = time.perf_counter()
+    if processes == 1:
+        records = [play_game(index) for index in range(games)]
+    else:
+        chunksize = max(1, games // (processes * 4))
+        with multiprocessing.Pool(processes, initializer=init_worker,
+                                  initargs=initargs) as pool:
+            records = list(pool.imap_unordered(play_game, range(games),
+                                               chunksize))
+    seconds = time.perf_counter() - start
+
+    draws = sum(record["winner"] is None for record in records)
+    agents = []
+    for agent, name in enumerate(names):
+        wins = sum(record["winner"] == agent for record in records)
+        wins_as_x = sum(record["winner"] == agent == record["x"]
+                        for record in records)
+        nodes = []
+        latencies = []
+        for record in records:
+            for mover, searched, latency in record["moves"]:
+                if mover == agent:
+                    nodes.append(searched)
+                    latencies.append(latency)
+        report = {
+            "agent": name,
+            "wins": wins,
+            "win_rate": wins / games if games else 0,
+            "wins_as_x": wins_as_x,
+            "wins_as_o": wins - wins_as_x,
+            "moves": len(nodes)
+        }
+        if nodes:
+            report["nodes_per_move"] = statistics.fmean(nodes)
+            report["latency_ms"] = {
+                "mean": statistics.fmean(latencies) * 1000,
+                "p50": percentile(latencies, 50) * 1000,
+                "p95": percentile(latencies, 95) * 1000,
+                "p99": percentile(latencies, 99) * 1000,
+                "max": max(latencies) * 1000
+            }
+        agents.append(report)
+
+    return {
+        "games": games,
+        "board": {"m": size[0], "n": size[1], "k": size[2]},
+        "openings": openings,
+        "seed": seed,
+        "processes": processes,
+        "seconds": seconds,
+        "draws": draws,
+        "draw_rate": draws / games if games else 0,
+        "agents": agents,
+        "python": sys.version.split()[0]
+    }
+
+
+def percentile(values, p):
+    """
+    Returns the `p`th percentile of `values` (nearest rank).
+    """
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[rank - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play Tic Tac Toe agents against each other.")
+    parser.add_argument("agents", nargs=2, choices=AGENTS)
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--processes", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--openings", type=int, default=0,
+                        help="random moves played before the agents start")
+    parser.add_argument("-m", type=int, default=3, help="rows")
+    parser.add_argument("-n", type=int, default=3, help="columns")
+    parser.add_argument("-k", type=int, default=3, help="marks in a row")
+    parser.add_argument("--time", type=float, default=1.0,
+                        help="seconds per move for the mnk agent")
+    args = parser.parse_args()
+
+    try:
+        report = run(args.agents, args.games, args.processes, args.seed,
+                     args.openings, (args.m, args.n, args.k), args.time)
+    except ValueError as e:
+        sys.exit(str(e))
+    print(json.dumps(report, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Precomputed solution of every reachable Tic Tac Toe position.
+
+The table has one byte per board, indexed by the board's base-3 code
+(3 ** 9 = 19683 bytes). A byte holds the minimax value plus one in its
+low two bits and the best square above them. Terminal positions have
+no square, and boards that cannot be reached in play are UNREACHABLE.
+
+Usage:
+    python solution.py [path]
+"""
+
+import argparse
+import os
+
+import bitboard
+
+FILENAME = "tictactoe.solution"
+PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), FILENAME)
+
+SIZE = 3 ** 9
+UNREACHABLE = 0xFF
+
+# Square stored for terminal positions
+NO_MOVE = 15
+
+# TERNARY[bits] is the base-3 code of the squares set in `bits`
+TERNARY = tuple(
+    sum(3 ** square for square in range(9) if bits >> square & 1)
+    for bits in range(1 << 9)
+)
+
+
+def code(x, o):
+    """Returns the base-3 code of a position (0 empty, 1 X, 2 O)."""
+    return TERNARY[x] + 2 * TERNARY[o]
+
+
+def pack(value, square):
+    if square is None:
+        square = NO_MOVE
+    return square << 2 | (value + 1)
+
+
+def unpack(byte):
+    """Returns (value, square) for a table byte."""
+    square = byte >> 2
+    return (byte & 3) - 1, None if square == NO_MOVE else square
+
+
+def solve():
+    """
+    Returns the solution table, found by visiting every position
+    reachable from the empty board once.
+    """
+    table = bytearray([UNREACHABLE]) * SIZE
+
+    def visit(x, o):
+        index = code(x, o)
+        if table[index] != UNREACHABLE:
+            return unpack(table[index])[0]
+
+        if bitboard.terminal(x, o):
+            value = bitboard.utility(x, o)
+            table[index] = pack(value, None)
+            return value
+
+        # Ties go to the earliest square in search order
+        maximizing = bitboard.to_move(x, o) == bitboard.X
+        best = None
+        move = None
+        for square in bitboard.moves(x, o):
+            if maximizing:
+                value = visit(x | 1 << square, o)
+            else:
+                value = visit(x, o | 1 << square)
+            if best is None or (value > best if maximizing
+                                else value < best):
+                best = value
+                move = square
+        table[index] = pack(best, move)
+        return best
+
+    visit(0, 0)
+    return table
+
+
+def write(table, path=PATH):
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(table)
+    os.replace(temporary, path)
+
+
+def load(path=PATH):
+    """
+    Returns the solution table at `path`, or None if there is no
+    usable table.
+    """
+    try:
+        with open(path, "rb") as f:
+            table = f.read()
+    except FileNotFoundError:
+        return None
+    if len(table) != SIZE:
+        return None
+    return table
+
+
+def lookup(table, x, o):
+    """
+    Returns (value, square) for a position, or None if the table does
+    not have it.
+    """
+    byte = table[code(x, o)]
+    if byte == UNREACHABLE:
+        return None
+    return unpack(byte)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Solve every reachable Tic Tac Toe position.")
+    parser.add_argument("path", nargs="?", default=PATH)
+    args = parser.parse_args()
+
+    table = solve()
+    write(table, args.path)
+    reachable = sum(byte != UNREACHABLE for byte in table)
+    print(f"Solved {reachable} positions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Background move search for the pygame runner.
+
+A MoveWorker searches for the computer's move on a daemon thread, so
+the UI loop keeps drawing frames while the computer thinks. The UI
+polls it each frame for the finished move and for the best move found
+so far, and cancels it when the game is abandoned.
+"""
+
+import threading
+from math import inf
+
+import bitboard
+import mnk
+import solution
+import tictactoe as ttt
+
+
+class MoveWorker():
+    def __init__(self, search):
+        """
+        `search(board, report, cancel)` returns the move for `board`.
+        It may call `report(move, depth=None)` with the best move so far,
+        and the depth searched if it searches in increasing depths, and
+        should stop early once the `cancel` threading.Event is set.
+        """
+        self.search = search
+        self.lock = threading.Lock()
+        self.cancelled = None
+        self.best = None
+        self.depth = None
+        self.move = None
+        self.done = False
+
+    def start(self, board):
+        """
+        Starts searching for a move on `board`, cancelling any search
+        still running.
+        """
+        self.cancel()
+        cancelled = threading.Event()
+        with self.lock:
+            self.cancelled = cancelled
+            self.best = None
+            self.depth = None
+            self.move = None
+            self.done = False
+
+        # Reports from a cancelled search are ignored
+        def report(move, depth=None):
+            with self.lock:
+                if not cancelled.is_set():
+                    self.best = move
+                    self.depth = depth
+
+        def run():
+            move = self.search(board, report, cancelled)
+            with self.lock:
+                if not cancelled.is_set():
+                    self.move = move
+                    self.done = True
+
+        board = [row[:] for row in board]
+        threading.Thread(target=run, daemon=True).start()
+
+    def cancel(self):
+        with self.lock:
+            if self.cancelled is not None:
+                self.cancelled.set()
+                self.cancelled = None
+            self.done = False
+
+    def poll(self):
+        """Returns the finished move, or None if there is none yet."""
+        with self.lock:
+            return self.move if self.done else None
+
+    def progress(self):
+        """
+        Returns (best move so far, depth searched), with None for
+        whichever is not known yet.
+        """
+        with self.lock:
+            return self.best, self.depth
+
+
+def minimax_search(board, report, cancel):
+    """
+    Returns the move for a 3x3 board from tictactoe's solution table,
+    or searches for it when there is no table. The search tries one
+    root move at a time with a table of its own, so a cancelled search
+    left running cannot touch the table later searches use. It reports
+    the best move so far after each root move and stops between root
+    moves once cancelled.
+    """
+    x, o = bitboard.encode(board)
+    if bitboard.terminal(x, o):
+        return None
+
+    if ttt.solutions is not None:
+        entry = solution.lookup(ttt.solutions, x, o)
+        if entry is not None:
+            move = bitboard.cell_of(entry[1])
+            report(move)
+            return move
+
+    table = bitboard.TranspositionTable()
+    maximizing = bitboard.to_move(x, o) == bitboard.X
+    alpha = -inf
+    beta = inf
+    move = None
+    for square in bitboard.moves(x, o):
+        if cancel.is_set():
+            return None
+        if maximizing:
+            value = bitboard.min_value(x | 1 << square, o, alpha, beta,
+                                       table)[0]
+            better = value > alpha or move is None
+            if better:
+                alpha = value
+        else:
+            value = bitboard.max_value(x, o | 1 << square, alpha, beta,
+                                       table)[0]
+            better = value < beta or move is None
+            if better:
+                beta = value
+        if better:
+            move = square
+        report(bitboard.cell_of(move))
+        if beta <= alpha:
+            break
+    return bitboard.cell_of(move)
+
+
+def mnk_search(game, time_limit=1.0):
+    """
+    Returns a search function for `game` that uses the iterative
+    deepening engine and reports the best move after each depth.
+    """
+    def search(board, report, cancel):
+        x, o = game.encode(board)
+        square = mnk.best_move(
+            game, x, o, time_limit, cancel=cancel,
+            report=lambda depth, square, value: report(game.cell(square),
+                                                       depth))
+        return game.cell(square)
+    return search
@@ -0,0 +1,492 @@
+"""
+Clause form of logical sentences, and a SAT solver for it.
+
+A CNF numbers each symbol from 1 and turns sentences into clauses:
+lists of non-zero ints, where -v is the negation of variable v, as in
+DIMACS files. Sentences that are already conjunctions of clauses are
+converted directly. Anything nested deeper gets a fresh variable
+standing for it (the Tseitin encoding), so the clause count grows
+linearly with the sentence instead of exponentially.
+
+Solver is a CDCL solver: unit propagation over two watched literals
+per clause, conflict analysis that learns a minimized clause at the
+first unique implication point, activity-based branching and restarts.
+Clauses can be added between calls, and solve() can take assumptions,
+so learned clauses are reused across many queries.
+"""
+
+import heapq
+
+from logic import (Sentence, Constant, Symbol, Not, And, Or, Implication,
+                   Biconditional)
+
+# Conflicts before the first restart; later restarts follow the Luby
+# sequence in multiples of this
+RESTART_BASE = 100
+
+# Activity decay per conflict
+DECAY = 0.95
+
+
+class CNF():
+    def __init__(self):
+        self.variables = {}
+        self.names = [None]
+        self.clauses = []
+
+        # Variables already standing for a compound sentence
+        self.definitions = {}
+
+        # Variable that is always true, once a constant needs one
+        self.true = None
+
+    @property
+    def num_variables(self):
+        return len(self.names) - 1
+
+    def variable(self, name):
+        """Returns the variable for the symbol called `name`."""
+        variable = self.variables.get(name)
+        if variable is None:
+            variable = self.new_variable()
+            self.variables[name] = variable
+            self.names[variable] = name
+        return variable
+
+    def new_variable(self):
+        self.names.append(None)
+        return len(self.names) - 1
+
+    def add(self, sentence):
+        """
+        Adds clauses asserting `sentence`. Returns the clauses added,
+        including any defining new variables.
+        """
+        start = len(self.clauses)
+        self.assert_sentence(sentence, True)
+        return self.clauses[start:]
+
+    def assert_sentence(self, sentence, positive):
+        """Adds clauses asserting `sentence`, or its negation."""
+        if isinstance(sentence, Not):
+            self.assert_sentence(sentence.operand, not positive)
+        elif isinstance(sentence, Symbol):
+            variable = self.variable(sentence.name)
+            self.clauses.append([variable if positive else -variable])
+        elif isinstance(sentence, Constant):
+            if sentence.value != positive:
+                self.clauses.append([])
+        elif isinstance(sentence, And) and positive:
+            for conjunct in sentence.conjuncts:
+                self.assert_sentence(conjunct, True)
+        elif isinstance(sentence, Or) and not positive:
+            for disjunct in sentence.disjuncts:
+                self.assert_sentence(disjunct, False)
+        elif isinstance(sentence, Or):
+            self.clauses.append([self.literal(disjunct)
+                                 for disjunct in sentence.disjuncts])
+        elif isinstance(sentence, And):
+            self.clauses.append([-self.literal(conjunct)
+                                 for conjunct in sentence.conjuncts])
+        elif isinstance(sentence, Implication):
+            if positive:
+                self.clauses.append([-self.literal(sentence.antecedent),
+                                     self.literal(sentence.consequent)])
+            else:
+                self.assert_sentence(sentence.antecedent, True)
+                self.assert_sentence(sentence.consequent, False)
+        elif isinstance(sentence, Biconditional):
+            left = self.literal(sentence.left)
+            right = self.literal(sentence.right)
+            if positive:
+                self.clauses.append([-left, right])
+                self.clauses.append([left, -right])
+            else:
+                self.clauses.append([left, right])
+                self.clauses.append([-left, -right])
+        else:
+            Sentence.validate(sentence)
+            raise TypeError(f"cannot convert {type(sentence).__name__}")
+
+    def literal(self, sentence):
+        """
+        Returns a literal equivalent to `sentence`, adding clauses that
+        define a new variable for it if it is not a literal already.
+        """
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+        if isinstance(sentence, Constant):
+            if self.true is None:
+                self.true = self.new_variable()
+                self.clauses.append([self.true])
+            return self.true if sentence.value else -self.true
+
+        variable = self.definitions.get(sentence)
+        if variable is not None:
+            return variable
+        variable = self.new_variable()
+        clauses = self.clauses
+
+        if isinstance(sentence, And):
+            literals = [self.literal(conjunct)
+                        for conjunct in sentence.conjuncts]
+            for literal in literals:
+                clauses.append([-variable, literal])
+            clauses.append([variable] + [-literal for literal in literals])
+        elif isinstance(sentence, Or):
+            literals = [self.literal(disjunct)
+                        for disjunct in sentence.disjuncts]
+            for literal in literals:
+                clauses.append([variable, -literal])
+            clauses.append([-variable] + literals)
+        elif isinstance(sentence, Implication):
+            antecedent = self.literal(sentence.antecedent)
+            consequent = self.literal(sentence.consequent)
+            clauses.append([-variable, -antecedent, consequent])
+            clauses.append([variable, antecedent])
+            clauses.append([variable, -consequent])
+        elif isinstance(sentence, Biconditional):
+            left = self.literal(sentence.left)
+            right = self.literal(sentence.right)
+            clauses.append([-variable, -left, right])
+            clauses.append([-variable, left, -right])
+            clauses.append([variable, left, right])
+            clauses.append([variable, -left, -right])
+        else:
+            Sentence.validate(sentence)
+            raise TypeError(f"cannot convert {type(sentence).__name__}")
+
+        self.definitions[sentence] = variable
+        return variable
+
+
+class Solver():
+    def __init__(self, clauses=()):
+        self.ok = True
+        self.num_variables = 0
+
+        # Per variable: 1 true, -1 false, 0 unassigned
+        self.values = [0]
+        self.levels = [0]
+        self.reasons = [None]
+        self.phases = [-1]
+        self.activity = [0.0]
+        self.increment = 1.0
+        self.order = []
+
+        self.trail = []
+        self.trail_limits = []
+        self.head = 0
+
+        # Clauses watching each literal
+        self.watches = {}
+        self.learned = []
+        self.model = None
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def ensure(self, variable):
+        """Makes room for variables up to `variable`."""
+        while self.num_variables < variable:
+            self.num_variables += 1
+            self.values.append(0)
+            self.levels.append(0)
+            self.reasons.append(None)
+            self.phases.append(-1)
+            self.activity.append(0.0)
+            heapq.heappush(self.order, (0.0, self.num_variables))
+
+    def value(self, literal):
+        value = self.values[abs(literal)]
+        return value if literal > 0 else -value
+
+    def add_clause(self, literals):
+        """
+        Adds a clause. Returns False if the clauses are now known to be
+        unsatisfiable.
+        """
+        if not self.ok:
+            return False
+        self.backtrack(0)
+
+        clause = []
+        for literal in literals:
+            self.ensure(abs(literal))
+            value = self.value(literal)
+            if value == 1 or -literal in clause:
+                # Already satisfied, or a tautology
+                return True
+            if value == 0 and literal not in clause:
+                clause.append(literal)
+
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self.assign(clause[0], None)
+            if self.propagate() is not None:
+                self.ok = False
+        else:
+            self.watch(clause)
+        return self.ok
+
+    def watch(self, clause):
+        self.watches.setdefault(clause[0], []).append(clause)
+        self.watches.setdefault(clause[1], []).append(clause)
+
+    def level(self):
+        return len(self.trail_limits)
+
+    def assign(self, literal, reason):
+        variable = abs(literal)
+        self.values[variable] = 1 if literal > 0 else -1
+        self.levels[variable] = self.level()
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Assigns every literal implied by unit clauses. Returns a clause
+        whose literals are all false, or None.
+        """
+        values = self.values
+        trail = self.trail
+        while self.head < len(trail):
+            literal = trail[self.head]
+            self.head += 1
+            self.propagations += 1
+            false = -literal
+            watchers = self.watches.get(false)
+            if not watchers:
+                continue
+
+            kept = []
+            conflict = None
+            for clause in watchers:
+                if conflict is not None:
+                    kept.append(clause)
+                    continue
+
+                # Keep the false literal second
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], false
+                first = clause[0]
+                if (values[first] if first > 0 else -values[-first]) == 1:
+                    kept.append(clause)
+                    continue
+
+                # Look for another literal to watch
+                for k in range(2, len(clause)):
+                    other = clause[k]
+                    if (values[other] if other > 0
+                            else -values[-other]) != -1:
+                        clause[1], clause[k] = other, false
+                        self.watches.setdefault(other, []).append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if (values[first] if first > 0
+                            else -values[-first]) == -1:
+                        conflict = clause
+                    else:
+                        self.assign(first, clause)
+            self.watches[false] = kept
+            if conflict is not None:
+                return conflict
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns (learned clause, level to go back to) for a conflict.
+        The learned clause's first literal is the one it asserts.
+        """
+        seen = set()
+        learned = [None]
+        level = self.level()
+        pending = 0
+        literal = None
+        index = len(self.trail) - 1
+        clause = conflict
+
+        while True:
+            for other in clause:
+                if other == literal:
+                    continue
+                variable = abs(other)
+                if variable in seen or self.levels[variable] == 0:
+                    continue
+                seen.add(variable)
+                self.bump(variable)
+                if self.levels[variable] == level:
+                    pending += 1
+                else:
+                    learned.append(other)
+
+            # The most recent assignment involved in the conflict
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.reasons[abs(literal)]
+
+        learned[0] = -literal
+
+        # Drop literals implied by the others' negations and level 0
+        minimized = [learned[0]]
+        for other in learned[1:]:
+            reason = self.reasons[abs(other)]
+            if reason is None or any(
+                    abs(implied) not in seen
+                    and self.levels[abs(implied)] > 0
+                    for implied in reason if implied != -other):
+                minimized.append(other)
+        learned = minimized
+        if len(learned) == 1:
+            return learned, 0
+
+        # Watch the literal from the highest remaining level second
+        deepest = max(range(1, len(learned)),
+                      key=lambda i: self.levels[abs(learned[i])])
+        learned[1], learned[deepest] = learned[deepest], learned[1]
+        return learned, self.levels[abs(learned[1])]
+
+    def bump(self, variable):
+        self.activity[variable] += self.increment
+        if self.activity[variable] > 1e100:
+            self.activity = [activity * 1e-100 for activity in self.activity]
+            self.increment *= 1e-100
+            self.order = [(-activity, variable) for variable, activity
+                          in enumerate(self.activity) if variable]
+            heapq.heapify(self.order)
+        heapq.heappush(self.order, (-self.activity[variable], variable))
+
+    def backtrack(self, level):
+        if self.level() <= level:
+            return
+        start = self.trail_limits[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.phases[variable] = self.values[variable]
+            self.values[variable] = 0
+            self.reasons[variable] = None
+            heapq.heappush(self.order, (-self.activity[variable], variable))
+        del self.trail[start:]
+        del self.trail_limits[level:]
+        self.head = start
+
+    def pick(self):
+        """Returns the next decision literal, or None if all are set."""
+        order = self.order
+        while order:
+            activity, variable = heapq.heappop(order)
+            if self.values[variable] == 0 and \
+                    -activity == self.activity[variable]:
+                return variable if self.phases[variable] == 1 else -variable
+        for variable in range(1, self.num_variables + 1):
+            if self.values[variable] == 0:
+                return variable if self.phases[variable] == 1 else -variable
+        return None
+
+    def solve(self, assumptions=()):
+        """
+        True if the clauses are satisfiable with every literal in
+        `assumptions` true. If so, `model` maps each variable to its
+        value.
+        """
+        self.model = None
+        if not self.ok:
+            return False
+        self.backtrack(0)
+        for literal in assumptions:
+            self.ensure(abs(literal))
+
+        restarts = 0
+        limit = RESTART_BASE * luby(restarts)
+        conflicts = 0
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                conflicts += 1
+                if self.level() == 0:
+                    self.ok = False
+                    return False
+                learned, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.learned.append(learned)
+                    self.watch(learned)
+                    self.assign(learned[0], learned)
+                self.increment /= DECAY
+                continue
+
+            if conflicts >= limit:
+                restarts += 1
+                limit = RESTART_BASE * luby(restarts)
+                conflicts = 0
+                self.backtrack(0)
+                continue
+
+            if self.level() < len(assumptions):
+                # Assumptions are decided first, one level each
+                literal = assumptions[self.level()]
+                value = self.value(literal)
+                if value == -1:
+                    self.backtrack(0)
+                    return False
+                self.trail_limits.append(len(self.trail))
+                if value == 0:
+                    self.assign(literal, None)
+                continue
+
+            literal = self.pick()
+            if literal is None:
+                self.model = {variable: self.values[variable] == 1
+                              for variable in range(1, self.num_variables + 1)}
+                self.backtrack(0)
+                return True
+            self.decisions += 1
+            self.trail_limits.append(len(self.trail))
+            self.assign(literal, None)
+
+
+def luby(i):
+    """Returns the `i`th term (from 0) of the Luby restart sequence."""
+    size = 1
+    exponent = 0
+    while size < i + 1:
+        exponent += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) // 2
+        exponent -= 1
+        i %= size
+    return 1 << exponent
+
+
+def satisfiable(sentence):
+    """True if some model makes `sentence` true."""
+    cnf = CNF()
+    cnf.add(sentence)
+    return Solver(cnf.clauses).solve()
+
+
+def entails(knowledge, query):
+    """
+    True if `knowledge` entails `query`, i.e. knowledge and not query
+    cannot both be true.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    cnf.add(Not(query))
+    return not Solver(cnf.clauses).solve()
@@ -0,0 +1,162 @@
+"""
+Immutable, hash-consed versions of the logic.py sentences.
+
+Each class here is a subclass of the logic.py class of the same name,
+so it works anywhere a sentence does. Constructing one returns the
+existing node if an equal sentence is alive already, so identical
+subtrees are shared. Equality of two interned sentences is identity,
+and each node keeps its hash and symbol set from construction, so both
+are O(1) instead of a walk over the tree. Children are stored in
+tuples, and nodes cannot be changed: And.add raises TypeError.
+
+Use intern() to convert a sentence built from the logic.py classes.
+"""
+
+import weakref
+
+import logic
+
+# Every live interned node, keyed on (kind, fields)
+table = weakref.WeakValueDictionary()
+
+
+class Interned():
+    __slots__ = ()
+
+    @classmethod
+    def make(cls, key, fields, hash_value, symbols):
+        """
+        Returns the interned node for `key`, creating it with the given
+        attribute values if there is none.
+        """
+        node = table.get(key)
+        if node is None:
+            node = object.__new__(cls)
+            for name, value in fields.items():
+                object.__setattr__(node, name, value)
+            object.__setattr__(node, "_hash", hash_value)
+            object.__setattr__(node, "_symbols", symbols)
+            table[key] = node
+        return node
+
+    def __init__(self, *args):
+        # Everything was set up by __new__
+        pass
+
+    def __setattr__(self, name, value):
+        raise TypeError("interned sentences are immutable")
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if isinstance(other, Interned):
+            return False
+        return super().__eq__(other)
+
+    def __hash__(self):
+        return self._hash
+
+    def symbols(self):
+        return set(self._symbols)
+
+
+class Constant(Interned, logic.Constant):
+    __slots__ = ("_hash", "_symbols", "__weakref__")
+
+    def __new__(cls, value):
+        value = bool(value)
+        return cls.make(("constant", value), {"value": value},
+                        hash(("constant", value)), frozenset())
+
+
+class Symbol(Interned, logic.Symbol):
+    __slots__ = ("_hash", "_symbols", "__weakref__")
+
+    def __new__(cls, name):
+        return cls.make(("symbol", name), {"name": name},
+                        hash(("symbol", name)), frozenset((name,)))
+
+
+class Not(Interned, logic.Not):
+    __slots__ = ("_hash", "_symbols", "__weakref__")
+
+    def __new__(cls, operand):
+        operand = intern(operand)
+        return cls.make(("not", operand), {"operand": operand},
+                        hash(("not", hash(operand))), operand._symbols)
+
+
+class And(Interned, logic.And):
+    __slots__ = ("_hash", "_symbols", "__weakref__")
+
+    def __new__(cls, *conjuncts):
+        conjuncts = tuple(intern(conjunct) for conjunct in conjuncts)
+        return cls.make(
+            ("and", conjuncts), {"conjuncts": conjuncts},
+            hash(("and", tuple(hash(conjunct) for conjunct in conjuncts))),
+            union(conjuncts))
+
+    def add(self, conjunct):
+        raise TypeError("interned sentences are immutable")
+
+
+class Or(Interned, logic.Or):
+    __slots__ = ("_hash", "_symbols", "__weakref__")
+
+    def __new__(cls, *disjuncts):
+        disjuncts = tuple(intern(disjunct) for disjunct in disjuncts)
+        return cls.make(
+            ("or", disjuncts), {"disjuncts": disjuncts},
+            hash(("or", tuple(hash(disjunct) for disjunct in disjuncts))),
+            union(disjuncts))
+
+
+class Implication(Interned, logic.Implication):
+    __slots__ = ("_hash", "_symbols", "__weakref__")
+
+    def __new__(cls, antecedent, consequent):
+        antecedent = intern(antecedent)
+        consequent = intern(consequent)
+        return cls.make(
+            ("implies", antecedent, consequent),
+            {"antecedent": antecedent, "consequent": consequent},
+            hash(("implies", hash(antecedent), hash(consequent))),
+            union((antecedent, consequent)))
+
+
+class Biconditional(Interned, logic.Biconditional):
+    __slots__ = ("_hash", "_symbols", "__weakref__")
+
+    def __new__(cls, left, right):
+        left = intern(left)
+        right = intern(right)
+        return cls.make(
+            ("biconditional", left, right), {"left": left, "right": right},
+            hash(("biconditional", hash(left), hash(right))),
+            union((left, right)))
+
+
+def union(children):
+    return frozenset().union(*(child._symbols for child in children))
+
+
+def intern(sentence):
+    """Returns the interned sentence equal to `sentence`."""
+    if isinstance(sentence, Interned):
+        return sentence
+    if isinstance(sentence, logic.Constant):
+        return Constant(sentence.value)
+    if isinstance(sentence, logic.Symbol):
+        return Symbol(sentence.name)
+    if isinstance(sentence, logic.Not):
+        return Not(sentence.operand)
+    if isinstance(sentence, logic.And):
+        return And(*sentence.conjuncts)
+    if isinstance(sentence, logic.Or):
+        return Or(*sentence.disjuncts)
+    if isinstance(sentence, logic.Implication):
+        return Implication(sentence.antecedent, sentence.consequent)
+    if isinstance(sentence, logic.Biconditional):
+        return Biconditional(sentence.left, sentence.right)
+    logic.Sentence.validate(sentence)
+    raise TypeError(f"cannot intern {type(sentence).__name__}")
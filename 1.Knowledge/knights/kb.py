@@ -0,0 +1,87 @@
+"""
+Incremental knowledge base.
+
+A KnowledgeBase converts each sentence it is told to clauses once and
+keeps them in a single SAT solver (see cnf.py). A query is entailed if
+the knowledge is unsatisfiable together with the query's negation,
+which is passed to the solver as an assumption rather than added as a
+clause. Nothing has to be undone between queries, and clauses learned
+while answering one query speed up the next.
+"""
+
+import cnf
+
+
+class KnowledgeBase():
+    def __init__(self, *sentences):
+        self.cnf = cnf.CNF()
+        self.solver = cnf.Solver()
+        self.sentences = []
+
+        # Clauses of self.cnf already given to the solver
+        self.synced = 0
+
+        for sentence in sentences:
+            self.tell(sentence)
+
+    def tell(self, sentence):
+        """Adds `sentence` to the knowledge."""
+        self.cnf.add(sentence)
+        self.sentences.append(sentence)
+        self.sync()
+
+    def sync(self):
+        # Symbols only ever queried still need a variable in models
+        self.solver.ensure(self.cnf.num_variables)
+        clauses = self.cnf.clauses
+        for clause in clauses[self.synced:]:
+            self.solver.add_clause(clause)
+        self.synced = len(clauses)
+
+    def literal(self, query):
+        literal = self.cnf.literal(query)
+        self.sync()
+        return literal
+
+    def satisfiable(self):
+        """True if the knowledge has a model."""
+        return self.solver.solve()
+
+    def ask(self, query):
+        """True if the knowledge entails `query`."""
+        return not self.solver.solve([-self.literal(query)])
+
+    def entailed(self, queries):
+        """
+        Returns the queries the knowledge entails, in order.
+
+        Each model found along the way rules out every query that is
+        false in it, so most queries are settled without a search of
+        their own.
+        """
+        literals = [self.literal(query) for query in queries]
+        if not self.solver.solve():
+            return list(queries)
+
+        # Queries not yet ruled out by a model
+        candidates = set()
+        for literal in literals:
+            if holds(self.solver.model, literal):
+                candidates.add(literal)
+
+        proven = set()
+        for literal in literals:
+            if literal not in candidates or literal in proven:
+                continue
+            if self.solver.solve([-literal]):
+                model = self.solver.model
+                candidates = {candidate for candidate in candidates
+                              if holds(model, candidate)}
+            else:
+                proven.add(literal)
+        return [query for query, literal in zip(queries, literals)
+                if literal in proven]
+
+
+def holds(model, literal):
+    return model[abs(literal)] == (literal > 0)
@@ -2,6 +2,7 @@ import itertools
 
 
 class Sentence():
+    __slots__ = ()
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
@@ -42,13 +43,41 @@ class Sentence():
             return f"({s})"
 
 
+class Constant(Sentence):
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = bool(value)
+
+    def __eq__(self, other):
+        return self is other or (isinstance(other, Constant)
+                                 and self.value == other.value)
+
+    def __hash__(self):
+        return hash(("constant", self.value))
+
+    def __repr__(self):
+        return "TRUE" if self.value else "FALSE"
+
+    def evaluate(self, model):
+        return self.value
+
+    def formula(self):
+        return "⊤" if self.value else "⊥"
+
+    def symbols(self):
+        return set()
+
+
 class Symbol(Sentence):
+    __slots__ = ("name",)
 
     def __init__(self, name):
         self.name = name
 
     def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+        return self is other or (isinstance(other, Symbol)
+                                 and self.name == other.name)
 
     def __hash__(self):
         return hash(("symbol", self.name))
@@ -70,12 +99,15 @@ class Symbol(Sentence):
 
 
 class Not(Sentence):
+    __slots__ = ("operand",)
+
     def __init__(self, operand):
         Sentence.validate(operand)
         self.operand = operand
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other or (isinstance(other, Not)
+                                 and self.operand == other.operand)
 
     def __hash__(self):
         return hash(("not", hash(self.operand)))
@@ -94,13 +126,17 @@ class Not(Sentence):
 
 
 class And(Sentence):
+    __slots__ = ("conjuncts",)
+
     def __init__(self, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
         self.conjuncts = list(conjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
+        return self is other or (
+            isinstance(other, And)
+            and tuple(self.conjuncts) == tuple(other.conjuncts))
 
     def __hash__(self):
         return hash(
@@ -131,13 +167,17 @@ class And(Sentence):
 
 
 class Or(Sentence):
+    __slots__ = ("disjuncts",)
+
     def __init__(self, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
         self.disjuncts = list(disjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
+        return self is other or (
+            isinstance(other, Or)
+            and tuple(self.disjuncts) == tuple(other.disjuncts))
 
     def __hash__(self):
         return hash(
@@ -162,6 +202,8 @@ class Or(Sentence):
 
 
 class Implication(Sentence):
+    __slots__ = ("antecedent", "consequent")
+
     def __init__(self, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
@@ -169,9 +211,9 @@ class Implication(Sentence):
         self.consequent = consequent
 
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other or (isinstance(other, Implication)
+                                 and self.antecedent == other.antecedent
+                                 and self.consequent == other.consequent)
 
     def __hash__(self):
         return hash(("implies", hash(self.antecedent), hash(self.consequent)))
@@ -193,6 +235,8 @@ class Implication(Sentence):
 
 
 class Biconditional(Sentence):
+    __slots__ = ("left", "right")
+
     def __init__(self, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
@@ -200,9 +244,9 @@ class Biconditional(Sentence):
         self.right = right
 
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other or (isinstance(other, Biconditional)
+                                 and self.left == other.left
+                                 and self.right == other.right)
 
     def __hash__(self):
         return hash(("biconditional", hash(self.left), hash(self.right)))
@@ -217,16 +261,42 @@ class Biconditional(Sentence):
                     and not self.right.evaluate(model)))
 
     def formula(self):
-        left = Sentence.parenthesize(str(self.left))
-        right = Sentence.parenthesize(str(self.right))
+        left = Sentence.parenthesize(self.left.formula())
+        right = Sentence.parenthesize(self.right.formula())
         return f"{left} <=> {right}"
 
     def symbols(self):
         return set.union(self.left.symbols(), self.right.symbols())
 
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+TRUE = Constant(True)
+FALSE = Constant(False)
+
+
+# Ways model_check can decide entailment
+BACKENDS = ("enumerate", "sat", "truthtable")
+
+
+def model_check(knowledge, query, backend="enumerate"):
+    """
+    Checks if knowledge base entails query.
+
+    The "enumerate" backend checks every model. The "sat" backend
+    converts knowledge and the negated query to clauses and asks the
+    SAT solver in cnf.py whether both can be true. The "truthtable"
+    backend checks every model too, but many at a time, with the
+    compiled bit vectors in truthtable.py.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown backend {backend!r}")
+
+    # These modules import this one
+    if backend == "sat":
+        import cnf
+        return cnf.entails(knowledge, query)
+    if backend == "truthtable":
+        import truthtable
+        return truthtable.entails(knowledge, query)
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
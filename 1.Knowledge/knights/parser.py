@@ -0,0 +1,245 @@
+"""
+Reads and writes logical sentences as text.
+
+parse() reads the syntax Sentence.formula() writes: ¬, ∧, ∨, => and
+<=> (tightest first), parentheses, ⊤ and ⊥ for the constants, and
+symbol names, which may contain spaces. A chain like A ∧ B ∧ C becomes
+one And, and => groups to the right.
+
+DIMACS CNF files are read into clauses or sentences, and any sentence
+can be written as one (via cnf.CNF). Written files map each variable
+number to its symbol name in "c <variable> <name>" comment lines,
+which are read back when present.
+
+Usage:
+    python parser.py [--dimacs] path
+"""
+
+import argparse
+import json
+import re
+import time
+
+import cnf
+from logic import (Symbol, Not, And, Or, Implication, Biconditional,
+                   TRUE, FALSE)
+
+OPERATORS = re.compile(r"(<=>|=>|[¬∧∨()⊤⊥])")
+COMMENT = re.compile(r"c\s+(\d+)\s+(.+)")
+
+
+class Parser():
+    def __init__(self, symbols=None):
+        """
+        `symbols` maps names to Symbols, so every sentence parsed with
+        the same dict shares one Symbol per name.
+        """
+        self.symbols = symbols if symbols is not None else {}
+
+    def parse(self, text):
+        """Returns the sentence written in `text`."""
+        self.tokens = [token.strip() for token in OPERATORS.split(text)]
+        if not any(self.tokens):
+            raise ValueError("empty formula")
+
+        # None marks the end, so peek() needs no bounds check
+        self.tokens = [token for token in self.tokens if token] + [None]
+        self.position = 0
+        sentence = self.biconditional()
+        if self.peek() is not None:
+            self.error("unexpected")
+        return sentence
+
+    def peek(self):
+        return self.tokens[self.position]
+
+    def error(self, problem):
+        token = self.peek()
+        if token is None:
+            raise ValueError(f"{problem} end of formula")
+        raise ValueError(f"{problem} {token!r} at token {self.position}")
+
+    def biconditional(self):
+        sentence = self.implication()
+        while self.peek() == "<=>":
+            self.position += 1
+            sentence = Biconditional(sentence, self.implication())
+        return sentence
+
+    def implication(self):
+        sentence = self.disjunction()
+        if self.peek() == "=>":
+            self.position += 1
+            sentence = Implication(sentence, self.implication())
+        return sentence
+
+    def disjunction(self):
+        disjuncts = [self.conjunction()]
+        while self.peek() == "∨":
+            self.position += 1
+            disjuncts.append(self.conjunction())
+        return disjuncts[0] if len(disjuncts) == 1 else Or(*disjuncts)
+
+    def conjunction(self):
+        conjuncts = [self.unary()]
+        while self.peek() == "∧":
+            self.position += 1
+            conjuncts.append(self.unary())
+        return conjuncts[0] if len(conjuncts) == 1 else And(*conjuncts)
+
+    def unary(self):
+        token = self.peek()
+        if token is None:
+            self.error("unexpected")
+        self.position += 1
+        if token == "¬":
+            return Not(self.unary())
+        if token == "(":
+            sentence = self.biconditional()
+            if self.peek() != ")":
+                self.error("expected ')' before")
+            self.position += 1
+            return sentence
+        if token == "⊤":
+            return TRUE
+        if token == "⊥":
+            return FALSE
+        if OPERATORS.fullmatch(token):
+            self.position -= 1
+            self.error("unexpected")
+        return self.symbol(token)
+
+    def symbol(self, name):
+        symbol = self.symbols.get(name)
+        if symbol is None:
+            symbol = Symbol(name)
+            self.symbols[name] = symbol
+        return symbol
+
+
+def parse(text):
+    """Returns the sentence written in `text`."""
+    return Parser().parse(text)
+
+
+def load(lines):
+    """
+    Returns the sentences in `lines`, one formula per line. Blank lines
+    and lines starting with # are skipped.
+    """
+    parser = Parser()
+    sentences = []
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            sentences.append(parser.parse(line))
+        except ValueError as e:
+            raise ValueError(f"line {number}: {e}")
+    return sentences
+
+
+def read_dimacs(lines):
+    """
+    Returns (clauses, names) from the lines of a DIMACS CNF file, where
+    `names` maps variables to the names given in comment lines.
+    """
+    clauses = []
+    names = {}
+    clause = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line[0] == "c":
+            match = COMMENT.fullmatch(line)
+            if match:
+                names[int(match.group(1))] = match.group(2)
+            continue
+        if line[0] == "p":
+            continue
+        if line[0] == "%":
+            # Some benchmark sets end their files this way
+            break
+        for literal in map(int, line.split()):
+            if literal == 0:
+                clauses.append(clause)
+                clause = []
+            else:
+                clause.append(literal)
+    if clause:
+        clauses.append(clause)
+    return clauses, names
+
+
+def load_dimacs(lines):
+    """
+    Returns the sentence for a DIMACS CNF file: an And of one Or per
+    clause. Variables without a name are named by their number.
+    """
+    clauses, names = read_dimacs(lines)
+    symbols = {}
+
+    def literal(number):
+        variable = abs(number)
+        symbol = symbols.get(variable)
+        if symbol is None:
+            symbol = Symbol(names.get(variable, str(variable)))
+            symbols[variable] = symbol
+        return symbol if number > 0 else Not(symbol)
+
+    return And(*[Or(*[literal(number) for number in clause])
+                 for clause in clauses])
+
+
+def dimacs(sentence):
+    """Returns `sentence` as the text of a DIMACS CNF file."""
+    converted = cnf.CNF()
+    converted.add(sentence)
+    lines = [f"c {variable} {name}"
+             for variable, name in enumerate(converted.names)
+             if name is not None]
+    lines.append(f"p cnf {converted.num_variables} "
+                 f"{len(converted.clauses)}")
+    for clause in converted.clauses:
+        lines.append(" ".join(map(str, clause + [0])))
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Load a knowledge base and check it is satisfiable.")
+    parser.add_argument("path", help="one formula per line, or DIMACS CNF")
+    parser.add_argument("--dimacs", action="store_true",
+                        help="read the file as DIMACS CNF")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with open(args.path, encoding="utf-8") as f:
+        if args.dimacs:
+            clauses, _ = read_dimacs(f)
+        else:
+            converted = cnf.CNF()
+            for sentence in load(f):
+                converted.add(sentence)
+            clauses = converted.clauses
+    loaded = time.perf_counter()
+
+    solver = cnf.Solver(clauses)
+    satisfiable = solver.solve()
+    solved = time.perf_counter()
+
+    print(json.dumps({
+        "variables": solver.num_variables,
+        "clauses": len(clauses),
+        "satisfiable": satisfiable,
+        "load_seconds": loaded - start,
+        "solve_seconds": solved - loaded,
+        "conflicts": solver.conflicts,
+        "decisions": solver.decisions
+    }, indent=4))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Rewrites logical sentences into smaller, equivalent ones.
+
+simplify() runs a pipeline of rewrites, each returning a new sentence
+and leaving its input alone:
+
+    eliminate  Implication and Biconditional into And, Or and Not
+    nnf        push Not down onto symbols (negation normal form)
+    fold       flatten nested And/Or, drop duplicates, fold constants
+               and complementary pairs like A ∧ ¬A
+    cnf        distribute Or over And into clauses, then drop
+               tautologies and clauses subsumed by smaller ones
+
+Distributing into clauses can grow a sentence exponentially. For large
+knowledge bases, stop at "nnf" and let cnf.CNF add definitions for
+nested parts instead.
+"""
+
+from logic import (Sentence, Constant, Symbol, Not, And, Or, Implication,
+                   Biconditional, TRUE, FALSE)
+
+# Forms simplify() can produce
+FORMS = ("nnf", "cnf")
+
+
+def simplify(sentence, form="nnf", stats=None):
+    """
+    Returns a sentence equivalent to `sentence` in the given form.
+
+    If a `stats` dict is given, it receives the size and depth of the
+    sentence before and after.
+    """
+    if form not in FORMS:
+        raise ValueError(f"unknown form {form!r}")
+
+    result = fold(nnf(eliminate(sentence)))
+    if form == "cnf":
+        result = cnf(result)
+
+    if stats is not None:
+        stats["before"] = {"size": size(sentence), "depth": depth(sentence)}
+        stats["after"] = {"size": size(result), "depth": depth(result)}
+    return result
+
+
+def eliminate(sentence):
+    """
+    Returns `sentence` with Implication and Biconditional rewritten
+    in terms of And, Or and Not.
+    """
+    if isinstance(sentence, (Symbol, Constant)):
+        return sentence
+    if isinstance(sentence, Not):
+        return Not(eliminate(sentence.operand))
+    if isinstance(sentence, And):
+        return And(*[eliminate(conjunct) for conjunct in sentence.conjuncts])
+    if isinstance(sentence, Or):
+        return Or(*[eliminate(disjunct) for disjunct in sentence.disjuncts])
+    if isinstance(sentence, Implication):
+        return Or(Not(eliminate(sentence.antecedent)),
+                  eliminate(sentence.consequent))
+    if isinstance(sentence, Biconditional):
+        left = eliminate(sentence.left)
+        right = eliminate(sentence.right)
+        return And(Or(Not(left), right), Or(left, Not(right)))
+    Sentence.validate(sentence)
+    raise TypeError(f"cannot simplify {type(sentence).__name__}")
+
+
+def nnf(sentence, negate=False):
+    """
+    Returns `sentence` (or its negation) in negation normal form.
+    The sentence must not contain Implication or Biconditional.
+    """
+    if isinstance(sentence, Symbol):
+        return Not(sentence) if negate else sentence
+    if isinstance(sentence, Constant):
+        return Constant(sentence.value != negate)
+    if isinstance(sentence, Not):
+        return nnf(sentence.operand, not negate)
+    if isinstance(sentence, And):
+        children = [nnf(conjunct, negate) for conjunct in sentence.conjuncts]
+        return Or(*children) if negate else And(*children)
+    if isinstance(sentence, Or):
+        children = [nnf(disjunct, negate) for disjunct in sentence.disjuncts]
+        return And(*children) if negate else Or(*children)
+    if isinstance(sentence, (Implication, Biconditional)):
+        return nnf(eliminate(sentence), negate)
+    Sentence.validate(sentence)
+    raise TypeError(f"cannot simplify {type(sentence).__name__}")
+
+
+def fold(sentence):
+    """
+    Returns a sentence in negation normal form with nested And/Or
+    flattened, duplicates dropped, and constants and complementary
+    pairs folded away.
+    """
+    if isinstance(sentence, (Symbol, Constant, Not)):
+        return sentence
+
+    if isinstance(sentence, And):
+        kind, children, unit, zero = And, sentence.conjuncts, TRUE, FALSE
+    elif isinstance(sentence, Or):
+        kind, children, unit, zero = Or, sentence.disjuncts, FALSE, TRUE
+    else:
+        return fold(nnf(sentence))
+
+    # Ordered, so the output keeps the order of the input
+    kept = {}
+    for child in children:
+        child = fold(child)
+        grandchildren = [child]
+        if isinstance(child, kind):
+            grandchildren = child.conjuncts if kind is And \
+                else child.disjuncts
+        for grandchild in grandchildren:
+            if grandchild == zero:
+                return zero
+            if grandchild == unit:
+                continue
+            if complement(grandchild) in kept:
+                return zero
+            kept[grandchild] = None
+
+    if not kept:
+        return unit
+    if len(kept) == 1:
+        return next(iter(kept))
+    return kind(*kept)
+
+
+def cnf(sentence):
+    """
+    Returns a sentence in negation normal form as an And of Or
+    clauses, without tautologies or subsumed clauses.
+    """
+    order = {}
+    clauses = prune(clause_set(fold(sentence), order))
+    if not clauses:
+        return TRUE
+    if frozenset() in clauses:
+        return FALSE
+
+    def key(literal):
+        name, positive = literal
+        return order[name], not positive
+
+    conjuncts = []
+    for clause in clauses:
+        literals = [Symbol(name) if positive else Not(Symbol(name))
+                    for name, positive in sorted(clause, key=key)]
+        conjuncts.append(literals[0] if len(literals) == 1
+                         else Or(*literals))
+    if len(conjuncts) == 1:
+        return conjuncts[0]
+    return And(*conjuncts)
+
+
+def clause_set(sentence, order):
+    """
+    Returns the clauses of a negation normal form sentence, as a list
+    of frozensets of (name, positive) literals. Symbol names are
+    numbered in `order` as they are first seen.
+    """
+    if isinstance(sentence, Constant):
+        return [] if sentence.value else [frozenset()]
+    if isinstance(sentence, (Symbol, Not)):
+        positive = isinstance(sentence, Symbol)
+        name = sentence.name if positive else sentence.operand.name
+        order.setdefault(name, len(order))
+        return [frozenset(((name, positive),))]
+    if isinstance(sentence, And):
+        clauses = []
+        for conjunct in sentence.conjuncts:
+            clauses.extend(clause_set(conjunct, order))
+        return prune(clauses)
+
+    clauses = [frozenset()]
+    for disjunct in sentence.disjuncts:
+        clauses = prune([left | right for left in clauses
+                          for right in clause_set(disjunct, order)])
+    return clauses
+
+
+def prune(clauses):
+    """
+    Returns `clauses` without tautologies, duplicates, and clauses
+    that contain another clause, in their original order.
+    """
+    unique = {}
+    for clause in clauses:
+        if not any((name, not positive) in clause
+                   for name, positive in clause):
+            unique[clause] = None
+
+    ordered = sorted(unique, key=len)
+    kept = set()
+    for i, clause in enumerate(ordered):
+        if not any(other <= clause for other in ordered[:i]
+                   if other in kept):
+            kept.add(clause)
+    return [clause for clause in unique if clause in kept]
+
+
+def complement(sentence):
+    """Returns the negation of a literal, or None."""
+    if isinstance(sentence, Symbol):
+        return Not(sentence)
+    if isinstance(sentence, Not):
+        return sentence.operand
+    return None
+
+
+def size(sentence):
+    """Returns the number of nodes in `sentence`."""
+    return 1 + sum(size(child) for child in children(sentence))
+
+
+def depth(sentence):
+    """Returns the number of nodes on the longest path from the root."""
+    return 1 + max((depth(child) for child in children(sentence)),
+                   default=0)
+
+
+def children(sentence):
+    if isinstance(sentence, Not):
+        return [sentence.operand]
+    if isinstance(sentence, And):
+        return sentence.conjuncts
+    if isinstance(sentence, Or):
+        return sentence.disjuncts
+    if isinstance(sentence, Implication):
+        return [sentence.antecedent, sentence.consequent]
+    if isinstance(sentence, Biconditional):
+        return [sentence.left, sentence.right]
+    return []
@@ -0,0 +1,58 @@
+import itertools
+import random
+
+from cnf import Solver
+
+
+def brute_force(clauses, num_variables):
+    """Returns every model of `clauses`, as tuples of variable values."""
+    models = []
+    for values in itertools.product((False, True), repeat=num_variables):
+        if all(any(values[abs(literal) - 1] == (literal > 0)
+                   for literal in clause) for clause in clauses):
+            models.append(values)
+    return models
+
+
+def random_3sat(rng, num_variables, num_clauses):
+    return [[rng.choice((-1, 1)) * variable
+             for variable in rng.sample(range(1, num_variables + 1), 3)]
+            for _ in range(num_clauses)]
+
+
+def main():
+    rng = random.Random(0)
+    results = {True: 0, False: 0}
+    for num_variables, num_clauses in [(8, 20), (8, 40), (10, 43),
+                                       (10, 50), (12, 51), (12, 70),
+                                       (14, 60), (14, 90)]:
+        for _ in range(5):
+            clauses = random_3sat(rng, num_variables, num_clauses)
+            models = brute_force(clauses, num_variables)
+
+            solver = Solver(clauses)
+            satisfiable = solver.solve()
+            assert satisfiable == bool(models), clauses
+            results[satisfiable] += 1
+            if satisfiable:
+                model = tuple(solver.model[variable]
+                              for variable in range(1, num_variables + 1))
+                assert model in models, clauses
+
+            # Assumptions on the same solver, reusing its learned clauses
+            for variable in range(1, num_variables + 1):
+                for literal in (variable, -variable):
+                    expected = any(values[variable - 1] == (literal > 0)
+                                   for values in models)
+                    assert solver.solve([literal]) == expected, \
+                        (clauses, literal)
+                    if expected:
+                        assert solver.model[variable] == (literal > 0)
+
+    # The instances above must cover both outcomes
+    assert results[True] and results[False], results
+    print(f"{results[True]} satisfiable, {results[False]} unsatisfiable: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Bit-parallel truth tables for logical sentences.
+
+A sentence is compiled once into a flat list of instructions over
+numbered registers, with symbols numbered instead of looked up by name.
+Each register holds a Python int used as a bit vector: bit m is the
+value in model m, where bit j of m is the value of symbol j. One pass
+over the instructions with bitwise operators therefore evaluates the
+sentence in 2 ** CHUNK_SYMBOLS models at once, instead of walking the
+tree once per model with dict lookups.
+"""
+
+from logic import (Sentence, Constant, Symbol, Not, And, Or, Implication,
+                   Biconditional)
+
+# Symbols whose values vary within one chunk of models; the rest are
+# fixed per chunk
+CHUNK_SYMBOLS = 16
+
+# Instruction opcodes
+SYMBOL = 0
+NOT = 1
+AND = 2
+OR = 3
+IMPLIES = 4
+IFF = 5
+CONSTANT = 6
+
+
+class Program():
+    def __init__(self):
+        self.symbols = {}
+        self.instructions = []
+
+        # Register holding each sentence compiled so far
+        self.registers = {}
+
+    def compile(self, sentence):
+        """
+        Adds instructions computing `sentence` and returns the register
+        that will hold it.
+        """
+        register = self.registers.get(sentence)
+        if register is not None:
+            return register
+
+        if isinstance(sentence, Symbol):
+            index = self.symbols.setdefault(sentence.name, len(self.symbols))
+            instruction = (SYMBOL, index)
+        elif isinstance(sentence, Constant):
+            instruction = (CONSTANT, sentence.value)
+        elif isinstance(sentence, Not):
+            instruction = (NOT, self.compile(sentence.operand))
+        elif isinstance(sentence, And):
+            instruction = (AND, tuple(self.compile(conjunct)
+                                      for conjunct in sentence.conjuncts))
+        elif isinstance(sentence, Or):
+            instruction = (OR, tuple(self.compile(disjunct)
+                                     for disjunct in sentence.disjuncts))
+        elif isinstance(sentence, Implication):
+            instruction = (IMPLIES, self.compile(sentence.antecedent),
+                           self.compile(sentence.consequent))
+        elif isinstance(sentence, Biconditional):
+            instruction = (IFF, self.compile(sentence.left),
+                           self.compile(sentence.right))
+        else:
+            Sentence.validate(sentence)
+            raise TypeError(f"cannot compile {type(sentence).__name__}")
+
+        register = len(self.instructions)
+        self.instructions.append(instruction)
+        self.registers[sentence] = register
+        return register
+
+    def chunks(self):
+        """
+        Yields the register values for each chunk of models, until all
+        2 ** (number of symbols) models are covered.
+        """
+        count = len(self.symbols)
+        width = min(count, CHUNK_SYMBOLS)
+        mask = (1 << (1 << width)) - 1
+        patterns = [pattern(j, width) for j in range(width)]
+
+        for chunk in range(1 << (count - width)):
+            values = []
+            for instruction in self.instructions:
+                opcode = instruction[0]
+                if opcode == SYMBOL:
+                    index = instruction[1]
+                    if index < width:
+                        value = patterns[index]
+                    elif chunk >> (index - width) & 1:
+                        value = mask
+                    else:
+                        value = 0
+                elif opcode == NOT:
+                    value = values[instruction[1]] ^ mask
+                elif opcode == AND:
+                    value = mask
+                    for register in instruction[1]:
+                        value &= values[register]
+                elif opcode == OR:
+                    value = 0
+                    for register in instruction[1]:
+                        value |= values[register]
+                elif opcode == CONSTANT:
+                    value = mask if instruction[1] else 0
+                elif opcode == IMPLIES:
+                    value = (values[instruction[1]] ^ mask) \
+                        | values[instruction[2]]
+                else:
+                    value = values[instruction[1]] ^ values[instruction[2]] \
+                        ^ mask
+                values.append(value)
+            yield values
+
+
+def pattern(j, width):
+    """
+    Returns the bit vector over 2 ** width models in which symbol `j`
+    is true: blocks of 2 ** j zeros and ones, alternating.
+    """
+    block = 1 << j
+    value = ((1 << block) - 1) << block
+    size = 2 * block
+    while size < 1 << width:
+        value |= value << size
+        size *= 2
+    return value
+
+
+def entails(knowledge, query):
+    """
+    True if `query` is true in every model in which `knowledge` is.
+    """
+    program = Program()
+    knowledge = program.compile(knowledge)
+    query = program.compile(query)
+    for values in program.chunks():
+        if values[knowledge] & ~values[query]:
+            return False
+    return True